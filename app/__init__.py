@@ -3,10 +3,12 @@ from app.extensions import scheduler, init_db, get_supabase_config
 from app.dashboard import init_app as init_dashboard
 from flask_cors import CORS
 from app.config import get_settings
+from app.json_provider import ORJSONProvider
 
 
 def create_app():
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
     CORS(app)  # Enable CORS for development
 
     settings = get_settings()
@@ -23,14 +25,18 @@ def create_app():
     # Register Blueprints
     init_dashboard(app)
 
-    # Load Tasks (This registers the cron jobs)
-    try:
-        from app import tasks
-
-        scheduler.start()
-        print("Scheduler started")
-    except Exception as e:
-        print(f"Failed to start scheduler: {e}")
+    # Load Tasks (This registers the cron jobs). Only one process should run
+    # them: with several workers, set RUN_SCHEDULER=false on all but one.
+    if settings.run_scheduler:
+        try:
+            from app import tasks
+
+            scheduler.start()
+            print("Scheduler started")
+        except Exception as e:
+            print(f"Failed to start scheduler: {e}")
+    else:
+        print("Scheduler disabled (RUN_SCHEDULER=false)")
 
     # Root route to check if app is running
     @app.route("/system/health")
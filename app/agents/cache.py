@@ -0,0 +1,44 @@
+"""
+In-process TTL cache shared by agent tools
+
+Wilson's market snapshots and Curator's external API responses are both
+re-requested well within their useful lifetime, so each keeps a small
+per-process cache of recent results.
+"""
+
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe in-process cache whose entries expire after ttl seconds."""
+
+    def __init__(self, ttl: float, maxsize: int = 8192):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the oldest entry when full."""
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._data.clear()
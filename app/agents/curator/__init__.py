@@ -1 +1,9 @@
-from app.agents.curator.agent import root_agent as curator, root_agent
+from app.agents.curator import agent
+from app.agents.curator.agent import get_curator
+
+
+def __getattr__(name):
+    """Build the Curator agent only when root_agent / curator is accessed."""
+    if name in ("root_agent", "curator"):
+        return get_curator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
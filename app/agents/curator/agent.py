@@ -5,44 +5,65 @@ Discovers, scores, and categorizes AI stocks from Russell 3000 index.
 Promotes high-quality AI stocks to watchlist for Wilson to trade.
 """
 
-from google.adk.agents import Agent
-from google.adk.models import LiteLlm
+from functools import lru_cache
 
 # Import config first to load environment variables
 from app.config import get_settings
 
-# Import Curator's tools
-from app.agents.curator.tools import scan_stock_for_ai, update_trading_universe, get_trading_universe
-
-# Import shared tools (reused from Wilson)
-from app.agents.tools import log_journal, add_to_watchlist, fetch_market_data
-
 # Import system prompt
 from app.agents.curator.prompt import CURATOR_SYSTEM_PROMPT
 
-# Load settings (this sets OPENROUTER_API_KEY in env)
-settings = get_settings()
-
-# Configure LiteLlm for OpenRouter (same as Wilson)
-# Model format: openrouter/<provider>/<model-name>
-model = LiteLlm(
-    model=settings.openrouter_llm_model,
-)
-
-# Define Curator Agent
-root_agent = curator = Agent(
-    name="Curator",
-    model=model,
-    description="AI Stock Universe Manager for DeepDiver trading system",
-    instruction=CURATOR_SYSTEM_PROMPT,
-    tools=[
-        # Curator-specific tools (3 new)
-        scan_stock_for_ai,
-        update_trading_universe,
-        get_trading_universe,
-        # Shared tools (3 reused from Wilson)
-        log_journal,
-        add_to_watchlist,
-        fetch_market_data,
-    ],
-)
+
+@lru_cache
+def get_curator():
+    """Build the Curator agent on first use.
+
+    google.adk, LiteLlm and the Curator tools (requests, psycopg2) are only
+    imported here, so importing this module stays cheap for Flask workers and
+    scheduler jobs that never run Curator.
+    """
+    from google.adk.agents import Agent
+    from google.adk.models import LiteLlm
+
+    # Import Curator's tools
+    from app.agents.curator.tools import scan_stock_for_ai, scan_stock_for_ai_batch, update_trading_universe, update_trading_universe_bulk, get_trading_universe
+
+    # Import shared tools (reused from Wilson)
+    from app.agents.tools import log_journal, add_to_watchlist, add_many_to_watchlist, fetch_market_data
+
+    # Load settings (this sets OPENROUTER_API_KEY in env)
+    settings = get_settings()
+
+    # Configure LiteLlm for OpenRouter (same as Wilson)
+    # Model format: openrouter/<provider>/<model-name>
+    model = LiteLlm(
+        model=settings.openrouter_llm_model,
+    )
+
+    # Define Curator Agent
+    return Agent(
+        name="Curator",
+        model=model,
+        description="AI Stock Universe Manager for DeepDiver trading system",
+        instruction=CURATOR_SYSTEM_PROMPT,
+        tools=[
+            # Curator-specific tools (5 new)
+            scan_stock_for_ai,
+            scan_stock_for_ai_batch,
+            update_trading_universe,
+            update_trading_universe_bulk,
+            get_trading_universe,
+            # Shared tools (4 reused from Wilson)
+            log_journal,
+            add_to_watchlist,
+            add_many_to_watchlist,
+            fetch_market_data,
+        ],
+    )
+
+
+def __getattr__(name):
+    """Expose root_agent / curator lazily (PEP 562) for ADK discovery."""
+    if name in ("root_agent", "curator"):
+        return get_curator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,73 @@
+"""
+Response caching for Curator's external data sources
+
+Finnhub profiles and news, and SEC EDGAR filing searches, change far more
+slowly than the universe is re-scanned, so responses are kept in a
+per-process TTL cache backed by the api_cache table in PostgreSQL (shared
+across workers and restarts).
+"""
+
+import orjson
+
+from app.agents.cache import TTLCache
+from app.agents.log import get_logger
+from app.db import execute_query, execute_update
+
+logger = get_logger("curator.cache")
+
+
+def _db_cache_get(endpoint: str, cache_key: str, ttl: float):
+    """Read a fresh payload from the api_cache table (None on miss or error)."""
+    try:
+        rows = execute_query(
+            """SELECT payload FROM api_cache
+               WHERE endpoint = %s AND cache_key = %s
+                 AND fetched_at > NOW() - %s * INTERVAL '1 second'""",
+            (endpoint, cache_key, ttl)
+        )
+        return rows[0]["payload"] if rows else None
+    except Exception as e:
+        logger.warning("api_cache read failed for %s/%s: %s", endpoint, cache_key, e)
+        return None
+
+
+def _db_cache_put(endpoint: str, cache_key: str, payload) -> None:
+    """Upsert a payload into the api_cache table (errors are logged, not raised)."""
+    try:
+        execute_update(
+            """INSERT INTO api_cache (endpoint, cache_key, fetched_at, payload)
+               VALUES (%s, %s, NOW(), %s)
+               ON CONFLICT (endpoint, cache_key)
+               DO UPDATE SET payload = EXCLUDED.payload, fetched_at = EXCLUDED.fetched_at""",
+            (endpoint, cache_key, orjson.dumps(payload).decode())
+        )
+    except Exception as e:
+        logger.warning("api_cache write failed for %s/%s: %s", endpoint, cache_key, e)
+
+
+def cached_fetch(endpoint: str, cache_key: str, cache: TTLCache, fetch):
+    """Return a payload from memory, then PostgreSQL, then by calling fetch().
+
+    Args:
+        endpoint: Logical endpoint name (e.g., 'finnhub.profile')
+        cache_key: Key within the endpoint (e.g., the ticker)
+        cache: In-process TTLCache for this endpoint; its ttl also bounds
+            the age of rows read back from PostgreSQL
+        fetch: Zero-argument callable that performs the HTTP request. If it
+            raises, nothing is cached and the exception propagates.
+
+    Returns:
+        The decoded JSON payload
+    """
+    key = (endpoint, cache_key)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = _db_cache_get(endpoint, cache_key, cache.ttl)
+    if payload is None:
+        payload = fetch()
+        _db_cache_put(endpoint, cache_key, payload)
+
+    cache.set(key, payload)
+    return payload
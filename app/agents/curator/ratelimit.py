@@ -0,0 +1,48 @@
+"""
+Client-side rate limiting for Curator's external data sources
+
+Finnhub's free tier allows 60 calls/minute and SEC EDGAR asks for at most
+10 requests/second. A universe sweep runs many scans in parallel, so each
+host gets one shared token bucket and requests wait for a token instead of
+tripping the provider's limit and backing off.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at rate_per_sec, holding up to burst tokens."""
+
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate = rate_per_sec
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until it is available."""
+        with self._lock:
+            self._refill(time.monotonic())
+            # Reserve the token up front so concurrent callers queue in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no new tokens for the next `seconds` (e.g. after a 429)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+# Finnhub free tier: 60 calls/minute sustained
+FINNHUB_BUCKET = TokenBucket(1.0, 5)
+# SEC EDGAR fair-access policy: 10 requests/second
+EDGAR_BUCKET = TokenBucket(10.0, 10)
@@ -6,11 +6,78 @@ from the Russell 3000 index.
 """
 
 from google.adk.tools import FunctionTool
-from app.db import execute_query, execute_insert, execute_update
+from app.db import execute_query, table_upsert
 from app.config import get_settings
+from app.agents.cache import TTLCache
+from app.agents.curator.cache import cached_fetch
+from app.agents.curator.ratelimit import EDGAR_BUCKET, FINNHUB_BUCKET, TokenBucket
+from app.agents.log import get_logger
 import requests
-import json
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import orjson
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+
+logger = get_logger("curator")
+
+# Shared HTTP session so keep-alive connections are reused across scans
+# (SEC EDGAR rejects requests without a descriptive User-Agent). 429s are
+# not retried here; _throttled_get pauses the host's token bucket instead.
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "DeepDiver/1.0 research@example.com"
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=64,
+        pool_maxsize=64,
+        max_retries=Retry(
+            total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]
+        ),
+    ),
+)
+
+# Attempts per GET when the provider answers 429 Too Many Requests
+RATE_LIMIT_ATTEMPTS = 3
+
+# Max tickers scanned concurrently by _scan_stock_for_ai_batch
+SCAN_BATCH_WORKERS = 16
+_SCAN_EXECUTOR = ThreadPoolExecutor(
+    max_workers=SCAN_BATCH_WORKERS, thread_name_prefix="curator-scan"
+)
+
+OPENROUTER_CHAT_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Tickers scanned more recently than this are served from trading_universe
+RESCAN_INTERVAL = timedelta(hours=24)
+
+# Borderline tickers classified per LLM call by _scan_stock_for_ai_batch
+LLM_VALIDATION_BATCH_SIZE = 15
+
+# Rows per INSERT ... ON CONFLICT statement when bulk-updating the universe
+UNIVERSE_UPSERT_BATCH_SIZE = 500
+
+# Columns returned by get_trading_universe (skips bookkeeping timestamps)
+_UNIVERSE_COLUMNS = "ticker, company_name, sector, category, involvement_level, score, is_active, last_scanned, notes"
+
+# Finnhub response caches: company profiles almost never change, and the
+# 7-day news window only needs refreshing once per daily scan
+_PROFILE_CACHE = TTLCache(ttl=30 * 86400)
+_NEWS_CACHE = TTLCache(ttl=86400)
+
+# EDGAR full-text search: 10-Ks are filed once a year, so results keep for
+# a quarter
+_EDGAR_CACHE = TTLCache(ttl=90 * 86400)
+_EDGAR_SEARCH_URL = "https://efts.sec.gov/LATEST/search-index"
+_EDGAR_BASE_PARAMS = {
+    "q": '"artificial intelligence" OR "machine learning" OR "generative AI"',
+    "forms": "10-K",
+    "dateRange": "custom",
+    "startdt": "2023-01-01",
+}
 
 
 # AI Keyword Taxonomy
@@ -88,13 +155,70 @@ AI_KEYWORDS = {
     },
 }
 
+# Points awarded per keyword hit, by tier (tier3 is too noisy to score)
+TIER_POINTS = {"tier1": 10, "tier2": 5}
+
+VALID_INVOLVEMENT_LEVELS = frozenset({"research_ai", "build_ai", "leverage_ai", "use_ai"})
+VALID_CATEGORIES = frozenset({
+    "ai_chip",
+    "ai_software",
+    "ai_cloud",
+    "ai_infrastructure",
+    "ai_beneficiary",
+})
+
+# Flattened (tier, keyword) table, built once so every text is matched in a
+# single pass over all scoring keywords, in taxonomy order
+_KEYWORD_MATCHER = tuple(
+    (tier, keyword)
+    for tier in TIER_POINTS
+    for keyword in AI_KEYWORDS[tier]["keywords"]
+)
+
+
+# Category implied by each scoring keyword: the first category (in priority
+# order) with a category keyword contained in it, or None
+_CATEGORY_PRIORITY = tuple(AI_KEYWORDS["tier1"]["categories"])
+_KEYWORD_CATEGORY = {
+    keyword: next(
+        (
+            category
+            for category, hints in AI_KEYWORDS["tier1"]["categories"].items()
+            if any(hint in keyword for hint in hints)
+        ),
+        None,
+    )
+    for _, keyword in _KEYWORD_MATCHER
+}
+
+
+def _match_keywords(text: str) -> list:
+    """Return (tier, keyword) for every scoring keyword found in text."""
+    return [(tier, keyword) for tier, keyword in _KEYWORD_MATCHER if keyword in text]
+
+
+def _throttled_get(bucket: TokenBucket, url: str, timeout: float) -> requests.Response:
+    """GET url once bucket grants a token, pausing the bucket on 429 responses."""
+    for _ in range(RATE_LIMIT_ATTEMPTS):
+        bucket.acquire()
+        response = _SESSION.get(url, timeout=timeout)
+        if response.status_code != 429:
+            break
+        try:
+            retry_after = float(response.headers.get("Retry-After", 1))
+        except ValueError:
+            retry_after = 1.0
+        bucket.pause(retry_after)
+    return response
+
 
 def _fetch_edgar_ai_mentions(ticker: str, company_name: str) -> dict:
     """Fetch AI-related mentions from SEC EDGAR 10-K filings (free, no API key).
 
     Uses EDGAR full-text search to find 'artificial intelligence' in recent
     10-K filings. Snippets reveal whether AI is mentioned in R&D, product,
-    or operations context.
+    or operations context. Results are cached per company for 90 days;
+    failed requests are not cached.
 
     Args:
         ticker: Stock symbol (used as fallback label only)
@@ -106,27 +230,16 @@ def _fetch_edgar_ai_mentions(ticker: str, company_name: str) -> dict:
             snippets (list[str]): Up to 5 text snippets from filings
             error (str): Error message if request failed (optional)
     """
-    import urllib.parse
-
-    base_url = "https://efts.sec.gov/LATEST/search-index"
     params = {
-        "q": '"artificial intelligence" OR "machine learning" OR "generative AI"',
-        "forms": "10-K",
-        "dateRange": "custom",
-        "startdt": "2023-01-01",
+        **_EDGAR_BASE_PARAMS,
         "enddt": datetime.now().strftime("%Y-%m-%d"),
         "entity": company_name,
     }
 
-    try:
-        url = f"{base_url}?{urllib.parse.urlencode(params)}"
-        response = requests.get(
-            url,
-            timeout=15,
-            headers={"User-Agent": "DeepDiver/1.0 research@example.com"},
-        )
+    def fetch():
+        response = _throttled_get(EDGAR_BUCKET, f"{_EDGAR_SEARCH_URL}?{urlencode(params)}", timeout=15)
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
 
         hits = data.get("hits", {}).get("hits", [])
         total = data.get("hits", {}).get("total", {}).get("value", 0)
@@ -144,6 +257,9 @@ def _fetch_edgar_ai_mentions(ticker: str, company_name: str) -> dict:
             "snippets": snippets,
         }
 
+    try:
+        return cached_fetch("sec.edgar", company_name, _EDGAR_CACHE, fetch)
+
     except requests.exceptions.HTTPError as e:
         return {
             "count": 0,
@@ -158,15 +274,115 @@ def _fetch_edgar_ai_mentions(ticker: str, company_name: str) -> dict:
         }
 
 
-def _scan_stock_for_ai(ticker: str) -> str:
+def _keyword_and_edgar(ticker: str) -> tuple:
+    """Run stages 1-2 for one ticker, returning (stage1_result, edgar_data).
+
+    EDGAR only needs the company name, so its request is sent as soon as the
+    Finnhub profile arrives and overlaps the news fetch and keyword scoring.
+    """
+    finnhub_api_key = _finnhub_api_key()
+
+    def edgar_after_profile():
+        try:
+            profile_data = profile_future.result()
+        except Exception:
+            profile_data = None
+        company_name = (profile_data or {}).get("name", ticker)
+        return _fetch_edgar_ai_mentions(ticker, company_name)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        profile_future = executor.submit(_fetch_finnhub_profile, ticker, finnhub_api_key)
+        news_future = executor.submit(_fetch_finnhub_news, ticker, finnhub_api_key)
+
+        # Stage 2: EDGAR fetch (always — cheap GET request)
+        edgar_future = executor.submit(edgar_after_profile)
+
+        # Stage 1: Keyword scoring (Finnhub)
+        result = _score_finnhub_data(ticker, profile_future, news_future)
+        return result, edgar_future.result()
+
+
+def _is_borderline(score: int) -> bool:
+    """Whether a keyword score needs LLM classification (stage 3)."""
+    return 30 <= score <= 70
+
+
+def _apply_classification(result: dict, edgar_data: dict, llm_result: dict = None) -> dict:
+    """Set involvement_level, applying the LLM verdict for borderline scores."""
+    if llm_result is not None:
+        result["score"] = llm_result["adjusted_score"]
+        result["category"] = llm_result["category"]
+        result["involvement_level"] = llm_result["involvement_level"]
+        result["evidence"] += f" | LLM: {llm_result['reasoning']}"
+    elif result["score"] > 70:
+        # High confidence AI company — skip LLM cost
+        result["involvement_level"] = "build_ai"
+    else:
+        # Low score — minimal AI involvement
+        result["involvement_level"] = "use_ai"
+
+    result["edgar_count"] = edgar_data.get("count", 0)
+    return result
+
+
+def _scan_error(ticker: str, error: Exception) -> dict:
+    """Result returned for a ticker whose scan raised."""
+    return {
+        "ticker": ticker,
+        "error": str(error),
+        "has_ai": False,
+        "score": 0,
+        "involvement_level": "use_ai",
+    }
+
+
+def _recently_scanned(tickers: list) -> dict:
+    """Look up tickers scanned within RESCAN_INTERVAL, keyed by ticker.
+
+    The stored trading_universe row stands in for a fresh scan: Finnhub news
+    and EDGAR filings cannot have moved the score meaningfully since then.
+    Lookup errors are logged and treated as a miss.
+    """
+    try:
+        rows = execute_query(
+            f"""SELECT {_UNIVERSE_COLUMNS} FROM trading_universe
+                WHERE ticker = ANY(%s) AND last_scanned > %s""",
+            (list(tickers), datetime.now(timezone.utc) - RESCAN_INTERVAL)
+        )
+    except Exception as e:
+        logger.warning("trading_universe lookup failed: %s", e)
+        return {}
+
+    return {
+        row["ticker"]: {
+            "ticker": row["ticker"],
+            "company_name": row["company_name"],
+            "sector": row["sector"],
+            "has_ai": (row["score"] or 0) >= 40,
+            "score": row["score"] or 0,
+            "category": row["category"],
+            "involvement_level": row["involvement_level"],
+            "evidence": row["notes"] or "",
+            "cached": True,
+            "last_scanned": row["last_scanned"].isoformat(),
+        }
+        for row in rows
+    }
+
+
+def _scan_stock_for_ai(ticker: str, force_refresh: bool = False) -> str:
     """Scans a stock for AI involvement using 3-stage detection.
 
     Stage 1: Keyword scoring (Finnhub profile + news)
     Stage 2: SEC EDGAR fetch (10-K filing snippets, always runs)
     Stage 3: LLM classification (only for borderline scores 30-70)
 
+    Tickers already scanned in the last 24 hours return their stored
+    trading_universe row (marked "cached": true) without any API calls.
+
     Args:
         ticker: Stock symbol to scan
+        force_refresh: Rescan even if the ticker was scanned recently
 
     Returns:
         JSON string with scan results including involvement_level
@@ -174,62 +390,146 @@ def _scan_stock_for_ai(ticker: str) -> str:
     ticker = ticker.upper().strip()
 
     try:
-        # Stage 1: Keyword scoring (Finnhub)
-        result = _keyword_scoring(ticker)
+        if not force_refresh:
+            cached = _recently_scanned([ticker]).get(ticker)
+            if cached is not None:
+                return orjson.dumps(cached).decode()
 
-        # Stage 2: EDGAR fetch (always — cheap GET request)
-        edgar_data = _fetch_edgar_ai_mentions(
-            ticker, result.get("company_name", ticker)
-        )
+        result, edgar_data = _keyword_and_edgar(ticker)
 
         # Stage 3: LLM classification (borderline only)
-        if 30 <= result["score"] <= 70:
+        llm_result = None
+        if _is_borderline(result["score"]):
             llm_result = _llm_validation(ticker, result, edgar_data)
-            result["score"] = llm_result["adjusted_score"]
-            result["category"] = llm_result["category"]
-            result["involvement_level"] = llm_result["involvement_level"]
-            result["evidence"] += f" | LLM: {llm_result['reasoning']}"
-        elif result["score"] > 70:
-            # High confidence AI company — skip LLM cost
-            result["involvement_level"] = "build_ai"
-        else:
-            # Low score — minimal AI involvement
-            result["involvement_level"] = "use_ai"
 
-        result["edgar_count"] = edgar_data.get("count", 0)
-        return json.dumps(result, indent=2)
+        result = _apply_classification(result, edgar_data, llm_result)
+        return orjson.dumps(result).decode()
 
     except Exception as e:
-        return json.dumps(
-            {
-                "ticker": ticker,
-                "error": str(e),
-                "has_ai": False,
-                "score": 0,
-                "involvement_level": "use_ai",
-            }
-        )
+        return orjson.dumps(_scan_error(ticker, e)).decode()
 
 
-def _keyword_scoring(ticker: str) -> dict:
-    """Stage 1: Keyword-based scoring using Finnhub company profile + news."""
+async def _scan_stock_for_ai_batch(tickers: str, force_refresh: bool = False) -> str:
+    """Scans several stocks for AI involvement concurrently.
 
-    settings = get_settings()
-    finnhub_api_key = settings.finnhub_api_key
+    Runs the same 3-stage detection as scan_stock_for_ai() for each ticker.
+    Stages 1-2 run on a pool of SCAN_BATCH_WORKERS threads so network
+    round-trips overlap; borderline tickers are then classified
+    LLM_VALIDATION_BATCH_SIZE at a time, one LLM call per group. Being a
+    coroutine, ADK awaits it instead of blocking its event loop for the
+    whole batch. Tickers scanned in the last 24 hours are served from
+    trading_universe, as in scan_stock_for_ai().
+
+    Args:
+        tickers: Comma-separated list of stock symbols (e.g., "NVDA,AMD,ORCL")
+        force_refresh: Rescan every ticker even if scanned recently
+
+    Returns:
+        JSON string with a list of scan results, in input order
+    """
+    ticker_list = [t.strip().upper() for t in tickers.split(",") if t.strip()]
+    loop = asyncio.get_running_loop()
+
+    def in_thread(func, *args):
+        return loop.run_in_executor(_SCAN_EXECUTOR, func, *args)
+
+    cached = {} if force_refresh else await in_thread(_recently_scanned, ticker_list)
+    to_scan = [ticker for ticker in ticker_list if ticker not in cached]
+
+    scanned = await asyncio.gather(
+        *(in_thread(_keyword_and_edgar, ticker) for ticker in to_scan),
+        return_exceptions=True,
+    )
+
+    # Stage 3: LLM classification (borderline only), batched
+    borderline = [
+        (ticker, *stages)
+        for ticker, stages in zip(to_scan, scanned)
+        if not isinstance(stages, Exception) and _is_borderline(stages[0]["score"])
+    ]
+    chunks = [
+        borderline[i : i + LLM_VALIDATION_BATCH_SIZE]
+        for i in range(0, len(borderline), LLM_VALIDATION_BATCH_SIZE)
+    ]
+    classified = await asyncio.gather(
+        *(in_thread(_llm_validation_batch, chunk) for chunk in chunks)
+    )
+    llm_results = {}
+    for chunk, chunk_results in zip(chunks, classified):
+        for (ticker, _, _), llm_result in zip(chunk, chunk_results):
+            llm_results[ticker] = llm_result
+
+    fresh = {}
+    for ticker, stages in zip(to_scan, scanned):
+        if isinstance(stages, Exception):
+            fresh[ticker] = _scan_error(ticker, stages)
+        else:
+            fresh[ticker] = _apply_classification(*stages, llm_results.get(ticker))
+
+    results = [cached.get(ticker) or fresh[ticker] for ticker in ticker_list]
+    return orjson.dumps(results).decode()
+
+
+def _fetch_finnhub_profile(ticker: str, api_key: str) -> dict:
+    """Fetch the Finnhub company profile for a ticker (cached for 30 days)."""
+
+    def fetch():
+        profile_url = f"https://finnhub.io/api/v1/stock/profile2?symbol={ticker}&token={api_key}"
+        response = _throttled_get(FINNHUB_BUCKET, profile_url, timeout=10)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    return cached_fetch("finnhub.profile", ticker, _PROFILE_CACHE, fetch)
+
+
+def _fetch_finnhub_news(ticker: str, api_key: str) -> list:
+    """Fetch the last 7 days of Finnhub company news for a ticker (cached for 1 day)."""
+
+    def fetch():
+        date_from = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        date_to = datetime.now().strftime("%Y-%m-%d")
+        news_url = f"https://finnhub.io/api/v1/company-news?symbol={ticker}&from={date_from}&to={date_to}&token={api_key}"
+        response = _throttled_get(FINNHUB_BUCKET, news_url, timeout=10)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    return cached_fetch("finnhub.news", ticker, _NEWS_CACHE, fetch)
+
+
+def _finnhub_api_key() -> str:
+    """Return the Finnhub API key, raising if it is not configured."""
+    finnhub_api_key = get_settings().finnhub_api_key
     if not finnhub_api_key:
         raise Exception("FINNHUB_API_KEY not set")
+    return finnhub_api_key
+
 
+def _keyword_scoring(ticker: str) -> dict:
+    """Stage 1: Keyword-based scoring using Finnhub company profile + news."""
+    finnhub_api_key = _finnhub_api_key()
+
+    # Profile and news are independent — fetch both in parallel
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        profile_future = executor.submit(_fetch_finnhub_profile, ticker, finnhub_api_key)
+        news_future = executor.submit(_fetch_finnhub_news, ticker, finnhub_api_key)
+        return _score_finnhub_data(ticker, profile_future, news_future)
+
+
+def _score_finnhub_data(ticker: str, profile_future, news_future) -> dict:
+    """Score in-flight Finnhub profile and news fetches (see _keyword_scoring).
+
+    Fetch errors are logged and the affected source contributes no score.
+    """
     score = 0
     evidence = []
+    categories = set()
     category = None
     company_name = ticker
     sector = None
 
-    # Fetch company profile
+    # Score company profile
     try:
-        profile_url = f"https://finnhub.io/api/v1/stock/profile2?symbol={ticker}&token={finnhub_api_key}"
-        profile_response = requests.get(profile_url, timeout=10)
-        profile_data = profile_response.json()
+        profile_data = profile_future.result()
 
         if profile_data:
             company_name = profile_data.get("name", ticker)
@@ -237,53 +537,42 @@ def _keyword_scoring(ticker: str) -> dict:
             description = profile_data.get("description", "").lower()
 
             # Score company description
-            for keyword in AI_KEYWORDS["tier1"]["keywords"]:
-                if keyword in description:
-                    score += 10
-                    evidence.append(f"Description: '{keyword}'")
-
-            for keyword in AI_KEYWORDS["tier2"]["keywords"]:
-                if keyword in description:
-                    score += 5
-                    evidence.append(f"Description: '{keyword}'")
+            for tier, keyword in _match_keywords(description):
+                score += TIER_POINTS[tier]
+                evidence.append(f"Description: '{keyword}'")
+                categories.add(_KEYWORD_CATEGORY[keyword])
 
     except Exception as e:
-        print(f"Warning: Could not fetch profile for {ticker}: {e}")
+        logger.warning("Could not fetch profile for %s: %s", ticker, e)
 
-    # Fetch recent news (last 7 days)
+    # Score recent news (last 7 days)
     try:
-        date_from = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-        date_to = datetime.now().strftime("%Y-%m-%d")
-        news_url = f"https://finnhub.io/api/v1/company-news?symbol={ticker}&from={date_from}&to={date_to}&token={finnhub_api_key}"
-        news_response = requests.get(news_url, timeout=10)
-        news_data = news_response.json()
+        news_data = news_future.result()
 
         # Limit to 10 most recent articles
         for article in news_data[:10]:
-            headline = article.get("headline", "").lower()
-            summary = article.get("summary", "").lower()
-            text = f"{headline} {summary}"
+            text = f"{article.get('headline', '')} {article.get('summary', '')}".lower()
 
-            for keyword in AI_KEYWORDS["tier1"]["keywords"]:
-                if keyword in text:
-                    score += 10
-                    evidence.append(f"News: '{keyword}' in headline")
-                    break  # Count once per article
+            # Count each tier once per article, crediting its first keyword
+            article_hits = {}
+            for tier, keyword in _match_keywords(text):
+                article_hits.setdefault(tier, keyword)
 
-            for keyword in AI_KEYWORDS["tier2"]["keywords"]:
-                if keyword in text:
-                    score += 5
-                    break
+            for tier, keyword in article_hits.items():
+                score += TIER_POINTS[tier]
+                if tier == "tier1":
+                    evidence.append(f"News: '{keyword}' in headline")
+                    categories.add(_KEYWORD_CATEGORY[keyword])
 
     except Exception as e:
-        print(f"Warning: Could not fetch news for {ticker}: {e}")
+        logger.warning("Could not fetch news for %s: %s", ticker, e)
 
     # Cap score at 100
     score = min(score, 100)
 
-    # Categorize based on keywords found
+    # Categorize based on keywords found (highest-priority category wins)
     if score > 0:
-        category = _categorize_stock(evidence)
+        category = next((c for c in _CATEGORY_PRIORITY if c in categories), None)
 
     return {
         "ticker": ticker,
@@ -296,27 +585,99 @@ def _keyword_scoring(ticker: str) -> dict:
     }
 
 
-def _categorize_stock(evidence: list) -> str:
-    """Determine AI category based on evidence."""
+_LLM_CLASSIFICATION_GUIDE = """involvement_level — choose one:
+- "research_ai": Core business IS AI research (dedicated AI labs, publishes AI papers, AI patents are primary IP)
+- "build_ai": Builds and SELLS AI products as primary business (AI chips, LLM platforms, AI SaaS)
+- "leverage_ai": Uses AI to SIGNIFICANTLY enhance existing products or margins
+- "use_ai": Uses off-the-shelf AI tools operationally
+
+category — choose one:
+- "ai_chip": Designs/manufactures AI processors (GPUs, TPUs, neural chips)
+- "ai_software": Builds AI applications, LLMs, or AI-native platforms
+- "ai_cloud": Provides AI infrastructure (training, inference, cloud AI services)
+- "ai_infrastructure": Enables AI (data centers, networking, storage for AI workloads)
+- "ai_beneficiary": Benefits from AI adoption but AI isn't core to product"""
+
+
+def _llm_company_record(ticker: str, stage1_result: dict, edgar_data: dict) -> str:
+    """Format one company's keyword and EDGAR evidence for a classification prompt."""
+    edgar_snippets = (
+        "\n".join(edgar_data.get("snippets", [])[:3]) or "No SEC filings found."
+    )
+    edgar_count = edgar_data.get("count", 0)
+
+    return f"""Company: {stage1_result["company_name"]} ({ticker})
+Sector: {stage1_result.get("sector", "Unknown")}
+Keyword Evidence: {stage1_result.get("evidence", "None")}
+Keyword Score: {stage1_result["score"]} / 100
+SEC 10-K AI Mentions: {edgar_count} filing(s) found
+SEC Snippets:
+{edgar_snippets}"""
 
-    evidence_text = " ".join(evidence).lower()
 
-    category_keywords = AI_KEYWORDS["tier1"]["categories"]
+def _llm_complete(prompt: str, max_tokens: int) -> str:
+    """Send a classification prompt to OpenRouter and return the JSON object text.
+
+    Posts straight to the chat completions endpoint over the shared session
+    in JSON mode. Markdown code fences and any text around the outermost
+    {...} are still stripped for models that ignore response_format.
+    """
+    settings = get_settings()
+    response = _SESSION.post(
+        OPENROUTER_CHAT_URL,
+        json={
+            "model": "google/gemini-flash-1.5",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"},
+        },
+        headers={"Authorization": f"Bearer {settings.openrouter_api_key.get_secret_value()}"},
+        timeout=60,
+    )
+    response.raise_for_status()
+    raw = response.json()["choices"][0]["message"]["content"].strip()
 
-    # Check each category
-    for category, keywords in category_keywords.items():
-        for keyword in keywords:
-            if keyword in evidence_text:
-                return category
+    # Strip markdown code fences if present
+    if raw.startswith("```"):
+        parts = raw.split("```")
+        raw = parts[1] if len(parts) > 1 else raw
+        if raw.startswith("json"):
+            raw = raw[4:].lstrip()
 
-    # Default category
-    return "ai_beneficiary"
+    # Extract JSON object region robustly (handles leading/trailing text)
+    start_idx = raw.find("{")
+    end_idx = raw.rfind("}")
+    if start_idx >= 0 and end_idx > start_idx:
+        raw = raw[start_idx : end_idx + 1]
+
+    return raw
+
+
+def _normalize_llm_result(result: dict, stage1_result: dict) -> dict:
+    """Validate an LLM classification, falling back to stage 1 values."""
+    return {
+        "involvement_level": result.get("involvement_level")
+        if result.get("involvement_level") in VALID_INVOLVEMENT_LEVELS
+        else "use_ai",
+        "category": result.get("category")
+        if result.get("category") in VALID_CATEGORIES
+        else stage1_result.get("category", "ai_beneficiary"),
+        "adjusted_score": max(
+            0,
+            min(
+                100,
+                int(result.get("adjusted_score", stage1_result.get("score", 50))),
+            ),
+        ),
+        "reasoning": str(result.get("reasoning", ""))[:500],
+    }
 
 
 def _llm_validation(ticker: str, stage1_result: dict, edgar_data: dict) -> dict:
     """Stage 2: LLM classification for involvement_level + category refinement.
 
-    Calls OpenRouter (via openai SDK) to classify:
+    Calls OpenRouter (chat completions API) to classify:
     - involvement_level: research_ai | build_ai | leverage_ai | use_ai
     - category: ai_chip | ai_software | ai_cloud | ai_infrastructure | ai_beneficiary
     - adjusted_score: keyword score +/- adjustment based on context
@@ -333,8 +694,6 @@ def _llm_validation(ticker: str, stage1_result: dict, edgar_data: dict) -> dict:
     Returns:
         dict with involvement_level, category, adjusted_score, reasoning
     """
-    from openai import OpenAI
-
     safe_default = {
         "involvement_level": "use_ai",
         "category": stage1_result.get("category", "ai_beneficiary"),
@@ -347,35 +706,13 @@ def _llm_validation(ticker: str, stage1_result: dict, edgar_data: dict) -> dict:
     if not openrouter_key:
         return safe_default
 
-    edgar_snippets = (
-        "\n".join(edgar_data.get("snippets", [])[:3]) or "No SEC filings found."
-    )
-    edgar_count = edgar_data.get("count", 0)
-
     prompt = f"""You are classifying a stock's relationship to AI for a trading system.
 
-Company: {stage1_result["company_name"]} ({ticker})
-Sector: {stage1_result.get("sector", "Unknown")}
-Keyword Evidence: {stage1_result.get("evidence", "None")}
-Keyword Score: {stage1_result["score"]} / 100
-SEC 10-K AI Mentions: {edgar_count} filing(s) found
-SEC Snippets:
-{edgar_snippets}
+{_llm_company_record(ticker, stage1_result, edgar_data)}
 
 Classify this company using BOTH fields:
 
-involvement_level — choose one:
-- "research_ai": Core business IS AI research (dedicated AI labs, publishes AI papers, AI patents are primary IP)
-- "build_ai": Builds and SELLS AI products as primary business (AI chips, LLM platforms, AI SaaS)
-- "leverage_ai": Uses AI to SIGNIFICANTLY enhance existing products or margins
-- "use_ai": Uses off-the-shelf AI tools operationally
-
-category — choose one:
-- "ai_chip": Designs/manufactures AI processors (GPUs, TPUs, neural chips)
-- "ai_software": Builds AI applications, LLMs, or AI-native platforms
-- "ai_cloud": Provides AI infrastructure (training, inference, cloud AI services)
-- "ai_infrastructure": Enables AI (data centers, networking, storage for AI workloads)
-- "ai_beneficiary": Benefits from AI adoption but AI isn't core to product
+{_LLM_CLASSIFICATION_GUIDE}
 
 adjusted_score: Start from {stage1_result["score"]}, adjust by at most +/-20.
 
@@ -388,64 +725,144 @@ Return ONLY valid JSON, no markdown:
 }}"""
 
     try:
-        client = OpenAI(
-            api_key=openrouter_key,
-            base_url="https://openrouter.ai/api/v1",
-        )
-        response = client.chat.completions.create(
-            model="google/gemini-flash-1.5",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-            max_tokens=200,
-        )
-        raw = response.choices[0].message.content.strip()
-
-        # Strip markdown code fences if present
-        if raw.startswith("```"):
-            parts = raw.split("```")
-            raw = parts[1] if len(parts) > 1 else raw
-            if raw.startswith("json"):
-                raw = raw[4:].lstrip()
-
-        # Extract JSON object region robustly (handles leading/trailing text)
-        start_idx = raw.find("{")
-        end_idx = raw.rfind("}")
-        if start_idx >= 0 and end_idx > start_idx:
-            raw = raw[start_idx : end_idx + 1]
-
-        result = json.loads(raw)
-
-        valid_levels = {"research_ai", "build_ai", "leverage_ai", "use_ai"}
-        valid_categories = {
-            "ai_chip",
-            "ai_software",
-            "ai_cloud",
-            "ai_infrastructure",
-            "ai_beneficiary",
-        }
-
-        return {
-            "involvement_level": result.get("involvement_level")
-            if result.get("involvement_level") in valid_levels
-            else "use_ai",
-            "category": result.get("category")
-            if result.get("category") in valid_categories
-            else safe_default["category"],
-            "adjusted_score": max(
-                0,
-                min(
-                    100,
-                    int(result.get("adjusted_score", stage1_result.get("score", 50))),
-                ),
-            ),
-            "reasoning": str(result.get("reasoning", ""))[:500],
-        }
+        raw = _llm_complete(prompt, max_tokens=200)
+        return _normalize_llm_result(orjson.loads(raw), stage1_result)
 
     except Exception as e:
         safe_default["reasoning"] = f"LLM error: {str(e)[:100]}"
         return safe_default
 
 
+def _llm_validation_batch(items: list) -> list:
+    """Stage 3 for several borderline tickers in a single LLM call.
+
+    Sends all companies in one numbered prompt so the instructions are paid
+    for once per batch instead of once per ticker. Any ticker missing or
+    malformed in the response (or the whole batch, if the call fails) is
+    classified individually with _llm_validation().
+
+    Args:
+        items: List of (ticker, stage1_result, edgar_data) tuples,
+            at most LLM_VALIDATION_BATCH_SIZE long
+
+    Returns:
+        List of _llm_validation()-shaped dicts, in input order
+    """
+    if len(items) == 1:
+        return [_llm_validation(*items[0])]
+
+    records = "\n\n".join(
+        f"{i}. {_llm_company_record(ticker, stage1_result, edgar_data)}\n"
+        f"adjusted_score: Start from {stage1_result['score']}, adjust by at most +/-20."
+        for i, (ticker, stage1_result, edgar_data) in enumerate(items, 1)
+    )
+
+    prompt = f"""You are classifying several stocks' relationship to AI for a trading system.
+
+{records}
+
+Classify each company using BOTH fields:
+
+{_LLM_CLASSIFICATION_GUIDE}
+
+Return ONLY valid JSON, no markdown, with one entry per company above:
+{{
+  "results": [
+    {{
+      "ticker": "...",
+      "involvement_level": "...",
+      "category": "...",
+      "adjusted_score": <integer 0-100>,
+      "reasoning": "<one sentence>"
+    }}
+  ]
+}}"""
+
+    by_ticker = {}
+    if get_settings().openrouter_api_key.get_secret_value():
+        try:
+            raw = _llm_complete(prompt, max_tokens=150 * len(items))
+            for entry in orjson.loads(raw).get("results", []):
+                if isinstance(entry, dict):
+                    by_ticker[str(entry.get("ticker", "")).upper()] = entry
+        except Exception as e:
+            logger.warning("Batched LLM validation failed, classifying individually: %s", e)
+
+    results = []
+    for ticker, stage1_result, edgar_data in items:
+        try:
+            results.append(_normalize_llm_result(by_ticker[ticker], stage1_result))
+        except Exception:
+            results.append(_llm_validation(ticker, stage1_result, edgar_data))
+    return results
+
+
+def _build_universe_row(ticker: str, data: dict, now: str) -> dict:
+    """Map update fields onto trading_universe columns, dropping invalid values.
+
+    now is the ISO timestamp (UTC) used for last_scanned, last_mention and
+    deactivated_at, computed once per batch by the caller.
+    """
+    row = {
+        "last_scanned": now,
+        "ticker": ticker
+    }
+
+    # Add optional fields
+    if "company_name" in data:
+        row["company_name"] = data["company_name"]
+    if "sector" in data:
+        row["sector"] = data["sector"]
+    if "category" in data:
+        row["category"] = data["category"]
+    if "score" in data:
+        row["score"] = int(data["score"])
+    if "is_active" in data:
+        row["is_active"] = bool(data["is_active"])
+        if not data["is_active"]:
+            row["deactivated_at"] = now
+    if "notes" in data:
+        row["notes"] = data["notes"]
+    if "involvement_level" in data:
+        level = data["involvement_level"]
+        if level in VALID_INVOLVEMENT_LEVELS:
+            row["involvement_level"] = level
+
+    # Update last_mention if mentioned in recent scan
+    if data.get("score", 0) > 0:
+        row["last_mention"] = now
+
+    return row
+
+
+def _bulk_update_trading_universe(rows: list) -> int:
+    """Add or update many stocks in trading_universe with batched upserts.
+
+    Rows for the same ticker are merged (later fields win) so each ticker is
+    written once, then sent in INSERT ... ON CONFLICT statements of
+    UNIVERSE_UPSERT_BATCH_SIZE rows instead of one round-trip per ticker.
+
+    Args:
+        rows: List of dicts, each with a 'ticker' key plus any of the fields
+            accepted by update_trading_universe()
+
+    Returns:
+        Number of distinct tickers written
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    upserts = {}
+    for data in rows:
+        ticker = data["ticker"].upper().strip()
+        upserts.setdefault(ticker, {}).update(_build_universe_row(ticker, data, now))
+
+    return table_upsert(
+        "trading_universe",
+        list(upserts.values()),
+        conflict="ticker",
+        page_size=UNIVERSE_UPSERT_BATCH_SIZE,
+    )
+
+
 def _update_trading_universe(ticker: str, data_json: str) -> str:
     """Add or update a stock in the trading_universe table.
 
@@ -465,56 +882,10 @@ def _update_trading_universe(ticker: str, data_json: str) -> str:
         Confirmation message
     """
     try:
-        data = json.loads(data_json)
+        data = orjson.loads(data_json)
         ticker = ticker.upper().strip()
 
-        # Prepare upsert data
-        upsert_data = {
-            "last_scanned": datetime.utcnow().isoformat(),
-            "ticker": ticker
-        }
-
-        # Add optional fields
-        if "company_name" in data:
-            upsert_data["company_name"] = data["company_name"]
-        if "sector" in data:
-            upsert_data["sector"] = data["sector"]
-        if "category" in data:
-            upsert_data["category"] = data["category"]
-        if "score" in data:
-            upsert_data["score"] = int(data["score"])
-        if "is_active" in data:
-            upsert_data["is_active"] = bool(data["is_active"])
-            if not data["is_active"]:
-                upsert_data["deactivated_at"] = datetime.utcnow().isoformat()
-        if "notes" in data:
-            upsert_data["notes"] = data["notes"]
-        if "involvement_level" in data:
-            valid_levels = {"research_ai", "build_ai", "leverage_ai", "use_ai"}
-            level = data["involvement_level"]
-            if level in valid_levels:
-                upsert_data["involvement_level"] = level
-
-        # Update last_mention if mentioned in recent scan
-        if data.get("score", 0) > 0:
-            upsert_data["last_mention"] = datetime.utcnow().isoformat()
-
-        # Try update first
-        columns = list(upsert_data.keys())
-        set_clause = ", ".join([f"{col} = %s" for col in columns])
-        values = list(upsert_data.values())
-
-        updated = execute_update(
-            f"UPDATE trading_universe SET {set_clause} WHERE ticker = %s",
-            tuple(values) + (ticker,)
-        )
-
-        if updated == 0:
-            # Insert if not exists
-            execute_insert(
-                f"INSERT INTO trading_universe ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
-                tuple(values)
-            )
+        _bulk_update_trading_universe([{**data, "ticker": ticker}])
 
         return f"✓ Updated {ticker} in trading_universe (score: {data.get('score', 'N/A')}, category: {data.get('category', 'N/A')})"
 
@@ -522,9 +893,44 @@ def _update_trading_universe(ticker: str, data_json: str) -> str:
         return f"Error updating trading_universe for {ticker}: {str(e)}"
 
 
+def _update_trading_universe_bulk(rows_json: str) -> str:
+    """Add or update many stocks in the trading_universe table in one call.
+
+    Prefer this over calling update_trading_universe() once per ticker; all
+    rows are written with batched upserts in a single transaction.
+
+    Args:
+        rows_json: JSON list of objects, each with a 'ticker' plus the same
+            fields accepted by update_trading_universe():
+            [
+                {'ticker': 'NVDA', 'score': 90, 'category': 'ai_chip',
+                 'involvement_level': 'build_ai', 'is_active': true},
+                ...
+            ]
+
+    Returns:
+        Confirmation message
+    """
+    try:
+        rows = orjson.loads(rows_json)
+        if not isinstance(rows, list):
+            return "Error updating trading_universe: rows_json must be a JSON list"
+
+        written = _bulk_update_trading_universe(rows)
+
+        return f"✓ Updated {written} stocks in trading_universe"
+
+    except Exception as e:
+        return f"Error updating trading_universe: {str(e)}"
+
+
 def _get_trading_universe(filters_json: str = "{}") -> str:
     """Query trading_universe table with filters.
 
+    Results are ordered by score (highest first, then ticker). When a page is
+    full, the response includes next_cursor; pass it back as 'after' to get
+    the next page.
+
     Args:
         filters_json: JSON string with filter criteria:
             {
@@ -532,17 +938,18 @@ def _get_trading_universe(filters_json: str = "{}") -> str:
                 'min_score': int,
                 'max_score': int,
                 'category': str,
-                'limit': int
+                'limit': int,
+                'after': {'score': int, 'ticker': str}
             }
 
     Returns:
         JSON string with list of matching stocks
     """
     try:
-        filters = json.loads(filters_json)
+        filters = orjson.loads(filters_json)
 
         # Build query
-        query = "SELECT * FROM trading_universe WHERE 1=1"
+        query = f"SELECT {_UNIVERSE_COLUMNS} FROM trading_universe WHERE 1=1"
         params = []
 
         # Apply filters
@@ -562,22 +969,39 @@ def _get_trading_universe(filters_json: str = "{}") -> str:
             query += " AND category = %s"
             params.append(filters["category"])
 
+        # Keyset pagination: resume after the last row of the previous page
+        if "after" in filters:
+            after = filters["after"]
+            if after.get("score") is None:
+                query += " AND score IS NULL AND ticker > %s"
+                params.append(after["ticker"])
+            else:
+                query += " AND (score < %s OR (score = %s AND ticker > %s) OR score IS NULL)"
+                params.extend([after["score"], after["score"], after["ticker"]])
+
         # Order by score descending
-        query += " ORDER BY score DESC"
+        query += " ORDER BY score DESC NULLS LAST, ticker"
 
         # Limit results
-        limit = filters.get("limit", 100)
-        query += f" LIMIT {limit}"
+        limit = int(filters.get("limit", 100))
+        query += " LIMIT %s"
+        params.append(limit)
+
+        stocks = execute_query(query, tuple(params))
 
-        result = execute_query(query, tuple(params) if params else None)
+        response = {"count": len(stocks), "stocks": stocks}
+        if stocks and len(stocks) == limit:
+            response["next_cursor"] = {"score": stocks[-1]["score"], "ticker": stocks[-1]["ticker"]}
 
-        return json.dumps({"count": len(result), "stocks": [dict(r) for r in result]}, indent=2, default=str)
+        return orjson.dumps(response, default=str).decode()
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return orjson.dumps({"error": str(e)}).decode()
 
 
 # Wrap functions with FunctionTool for google-adk compatibility
 scan_stock_for_ai = FunctionTool(_scan_stock_for_ai)
 update_trading_universe = FunctionTool(_update_trading_universe)
 get_trading_universe = FunctionTool(_get_trading_universe)
+scan_stock_for_ai_batch = FunctionTool(_scan_stock_for_ai_batch)
+update_trading_universe_bulk = FunctionTool(_update_trading_universe_bulk)
@@ -0,0 +1,32 @@
+"""
+Queued warning logger for agent tools
+
+Scans fan out across many worker threads, and printing warnings straight
+to stdout makes every worker contend on the stream lock. Tool loggers
+instead put records on a queue that a single background thread writes out.
+"""
+
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+_QUEUE = queue.SimpleQueue()
+
+_stdout = logging.StreamHandler(sys.stdout)
+_stdout.setFormatter(logging.Formatter("%(levelname)s [%(name)s] %(message)s"))
+
+_LISTENER = QueueListener(_QUEUE, _stdout)
+_LISTENER.start()
+atexit.register(_LISTENER.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger whose records are written by the background listener."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(QueueHandler(_QUEUE))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
@@ -1,34 +1,128 @@
 from google.adk.tools import FunctionTool
-from app.db import execute_query, execute_insert, execute_update
+from app.db import execute_query, execute_insert, execute_many, execute_update, table_upsert
 from app.config import get_settings
-import requests
-import json
-from datetime import datetime
+from app.agents.log import get_logger
+from app.agents.cache import TTLCache
+import asyncio
+import atexit
+import orjson
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+logger = get_logger("wilson")
+
+
+# Journal rows are buffered and written in batches by a background thread,
+# flushed every JOURNAL_FLUSH_SECONDS or as soon as JOURNAL_FLUSH_ROWS queue up.
+# A batch that fails to insert is requeued and retried on the next flush, up to
+# JOURNAL_MAX_ATTEMPTS consecutive failures, after which it is dropped
+JOURNAL_FLUSH_ROWS = 50
+JOURNAL_FLUSH_SECONDS = 2.0
+JOURNAL_MAX_ATTEMPTS = 3
+
+_journal_buffer = deque()
+_journal_failures = 0
+_journal_wake = threading.Event()
+_journal_flusher = None
+_journal_flusher_lock = threading.Lock()
+
+
+def flush_journal() -> int:
+    """Write all buffered journal rows now, returning how many were written.
+
+    On a failed insert the rows go back to the front of the buffer for the
+    next flush; after JOURNAL_MAX_ATTEMPTS failures in a row they are dropped
+    and logged as an error.
+    """
+    global _journal_failures
+    rows = []
+    while _journal_buffer:
+        rows.append(_journal_buffer.popleft())
+    if not rows:
+        return 0
+    try:
+        written = execute_many(
+            "INSERT INTO journal (agent_name, category, content, created_at) VALUES %s",
+            rows
+        )
+    except Exception as e:
+        _journal_failures += 1
+        if _journal_failures >= JOURNAL_MAX_ATTEMPTS:
+            _journal_failures = 0
+            logger.error("Journal write failed, dropped %d entries: %s", len(rows), e)
+        else:
+            _journal_buffer.extendleft(reversed(rows))
+            logger.warning("Journal write failed, will retry %d entries: %s", len(rows), e)
+        return 0
+    _journal_failures = 0
+    return written
+
+
+def _journal_flush_loop():
+    while True:
+        _journal_wake.wait(timeout=JOURNAL_FLUSH_SECONDS)
+        _journal_wake.clear()
+        flush_journal()
+
+
+def _start_journal_flusher():
+    global _journal_flusher
+    with _journal_flusher_lock:
+        if _journal_flusher is None:
+            _journal_flusher = threading.Thread(
+                target=_journal_flush_loop, name="journal-flusher", daemon=True
+            )
+            _journal_flusher.start()
+            atexit.register(flush_journal)
 
 
 def _log_journal(agent: str, category: str, content: str) -> str:
     """Logs an event to the local PostgreSQL database.
 
+    Entries are buffered and written in batches within a couple of seconds;
+    call flush_journal() before reading the journal back. The buffer lives in
+    memory: a normal exit flushes it, but rows still queued when the process
+    is killed outright (SIGKILL, OOM) are lost, since the flusher is a daemon
+    thread and atexit handlers do not run.
+
     Args:
         agent: Name of the agent (e.g., 'Wilson', 'Scanner').
         category: Type of log (Trade, Error, Summary, Signal, Thinking).
         content: The message to log.
     """
-    try:
-        data = {
-            "agent_name": agent,
-            "category": category,
-            "content": content,
-            "created_at": datetime.utcnow().isoformat(),
-        }
-        execute_insert(
-            "INSERT INTO journal (agent_name, category, content, created_at) VALUES (%s, %s, %s, %s)",
-            (data["agent_name"], data["category"], data["content"], data["created_at"])
-        )
-        return "Logged successfully."
-    except Exception as e:
-        print(f"[Log Error] {e}")
-        return f"Log failed: {e}"
+    if _journal_flusher is None:
+        _start_journal_flusher()
+
+    _journal_buffer.append((agent, category, content, datetime.now(timezone.utc)))
+    if len(_journal_buffer) >= JOURNAL_FLUSH_ROWS:
+        _journal_wake.set()
+    return "Queued for the journal."
+
+
+_MARKET_TZ = ZoneInfo("America/New_York")
+
+# Regular session, in minutes after midnight Eastern (9:30 AM - 4:00 PM)
+_MARKET_OPEN_MINUTE = 9 * 60 + 30
+_MARKET_CLOSE_MINUTE = 16 * 60
+
+
+@lru_cache(maxsize=1)
+def _nyse_holidays() -> frozenset:
+    """Full-day NYSE closures as dates, built on first use.
+
+    Covers scheduled holidays plus special closures such as national days of
+    mourning. pandas_market_calendars is imported here rather than at module
+    level so importing the tools does not pay for it.
+    """
+    import pandas_market_calendars as mcal
+
+    return frozenset(
+        d.astype("datetime64[D]").item()
+        for d in mcal.get_calendar("NYSE").holidays().holidays
+    )
 
 
 def _check_market_status() -> str:
@@ -37,22 +131,33 @@ def _check_market_status() -> str:
     Returns:
         A string indicating if the market is OPEN or CLOSED, and the time.
     """
-    # Simple check based on time (9:30 AM - 4:00 PM ET)
-    from datetime import datetime
-    import pytz
+    now = datetime.now(_MARKET_TZ)
+    minute = now.hour * 60 + now.minute
 
-    tz = pytz.timezone("US/Eastern")
-    now = datetime.now(tz)
-
-    is_weekday = now.weekday() < 5
-    is_market_hours = (now.hour > 9 or (now.hour == 9 and now.minute >= 30)) and (
-        now.hour < 16
+    is_open = (
+        now.weekday() < 5
+        and _MARKET_OPEN_MINUTE <= minute < _MARKET_CLOSE_MINUTE
+        and now.date() not in _nyse_holidays()
     )
 
-    status = "OPEN" if is_weekday and is_market_hours else "CLOSED"
+    status = "OPEN" if is_open else "CLOSED"
     return f"Market is {status} (Time: {now.strftime('%Y-%m-%d %H:%M:%S %Z')})"
 
 
+# Snapshots requested again within a single agent turn are served from
+# memory. Entries map ticker -> row and are keyed on the sorted, de-duplicated
+# symbol set, so "NVDA,AMD" and "amd, nvda" share one entry
+_MARKET_DATA_CACHE = TTLCache(ttl=30, maxsize=256)
+
+
+@lru_cache(maxsize=4)
+def _alpaca_data_client(api_key: str, secret_key: str):
+    """Alpaca market data client, built once per key pair and reused across calls."""
+    from alpaca.data.historical import StockHistoricalDataClient
+
+    return StockHistoricalDataClient(api_key, secret_key)
+
+
 def _fetch_market_data(tickers: str) -> str:
     """Fetches real-time price and technical data from Alpaca.
 
@@ -69,56 +174,56 @@ def _fetch_market_data(tickers: str) -> str:
     if not api_key or not secret_key:
         return "Error: ALPACA_API_KEY and ALPACA_SECRET_KEY must be set in environment"
 
+    # Unique symbols in the order asked for; rows come back in this order
+    ticker_list = list(dict.fromkeys(t.strip().upper() for t in tickers.split(",")))
+    cache_key = tuple(sorted(ticker_list))
+    cached = _MARKET_DATA_CACHE.get(cache_key)
+    if cached is not None:
+        return orjson.dumps([cached[t] for t in ticker_list if t in cached]).decode()
+
     try:
-        from alpaca.data.historical import StockHistoricalDataClient
         from alpaca.data.requests import StockSnapshotRequest
 
-        client = StockHistoricalDataClient(api_key, secret_key)
-        ticker_list = [t.strip().upper() for t in tickers.split(",")]
+        client = _alpaca_data_client(api_key, secret_key)
 
         # Create request for stock snapshots
         request = StockSnapshotRequest(symbol_or_symbols=ticker_list)
         snapshots = client.get_stock_snapshot(request)
 
-        results = []
+        results = {}
         for ticker in ticker_list:
             try:
                 snapshot = snapshots.get(ticker)
                 if snapshot and snapshot.latest_trade:
+                    bar = snapshot.daily_bar
+                    prev_bar = snapshot.previous_daily_bar
+
                     # Calculate change percentage
-                    if (
-                        snapshot.daily_bar
-                        and snapshot.daily_bar.close
-                        and snapshot.previous_daily_bar
-                    ):
-                        prev_close = snapshot.previous_daily_bar.close
-                        current_close = snapshot.daily_bar.close
-                        change_pct = ((current_close - prev_close) / prev_close) * 100
+                    if bar and bar.close and prev_bar:
+                        change_pct = ((bar.close - prev_bar.close) / prev_bar.close) * 100
                     else:
                         change_pct = 0.0
 
+                    if bar:
+                        volume, high, low = int(bar.volume), float(bar.high), float(bar.low)
+                    else:
+                        volume = high = low = 0
+
                     data = {
                         "ticker": ticker,
-                        "price": float(snapshot.latest_trade.price)
-                        if snapshot.latest_trade
-                        else 0,
-                        "volume": int(snapshot.daily_bar.volume)
-                        if snapshot.daily_bar
-                        else 0,
+                        "price": float(snapshot.latest_trade.price),
+                        "volume": volume,
                         "change_pct": round(change_pct, 2),
-                        "high": float(snapshot.daily_bar.high)
-                        if snapshot.daily_bar
-                        else 0,
-                        "low": float(snapshot.daily_bar.low)
-                        if snapshot.daily_bar
-                        else 0,
+                        "high": high,
+                        "low": low,
                     }
-                    results.append(data)
+                    results[ticker] = data
             except Exception as e:
-                print(f"Error fetching {ticker}: {e}")
+                logger.warning("Error fetching %s: %s", ticker, e)
                 continue
 
-        return json.dumps(results, indent=2)
+        _MARKET_DATA_CACHE.set(cache_key, results)
+        return orjson.dumps(list(results.values())).decode()
 
     except Exception as e:
         return f"Error fetching market data: {str(e)}"
@@ -138,8 +243,8 @@ def _write_scan_results(
         Confirmation message with scan ID
     """
     try:
-        stocks = json.loads(stocks_json)
-        metadata = json.loads(metadata_json)
+        stocks = orjson.loads(stocks_json)
+        metadata = orjson.loads(metadata_json)
 
         scan_data = {
             "scan_time": datetime.now().isoformat(),
@@ -149,7 +254,7 @@ def _write_scan_results(
             "account_balance": metadata.get("account_balance"),
             "risk_per_trade": metadata.get("risk_per_trade"),
             "actionable_count": len(stocks),
-            "metadata": json.dumps(metadata),
+            "metadata": orjson.dumps(metadata).decode(),
         }
 
         # Insert scan
@@ -162,15 +267,17 @@ def _write_scan_results(
         )
 
         # Insert stocks
-        for stock in stocks:
-            execute_insert(
-                """INSERT INTO scan_stocks (scan_id, ticker, pivot, stop, rs_rating, comp_rating, eps_rating, setup_type, notes, metadata)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+        execute_many(
+            """INSERT INTO scan_stocks (scan_id, ticker, pivot, stop, rs_rating, comp_rating, eps_rating, setup_type, notes, metadata)
+               VALUES %s""",
+            [
                 (scan_id, stock.get("ticker"), stock.get("pivot"), stock.get("stop"),
                  stock.get("rs_rating"), stock.get("comp_rating"), stock.get("eps_rating"),
                  stock.get("setup_type"), stock.get("notes"),
-                 json.dumps(stock.get("metadata", {})))
-            )
+                 orjson.dumps(stock.get("metadata", {})).decode())
+                for stock in stocks
+            ]
+        )
 
         return f"✓ Scan saved successfully (ID: {scan_id}, {len(stocks)} stocks)"
 
@@ -178,6 +285,11 @@ def _write_scan_results(
         return f"Error saving scan: {str(e)}"
 
 
+# Open-position columns the agent acts on; status, close and P&L fields are
+# always empty/'open' for these rows
+_POSITION_COLUMNS = "id, ticker, account, trade_type, entry_date, entry_price, shares, stop_price, target_price, setup_type, notes"
+
+
 def _get_current_positions() -> str:
     """Retrieves all open positions from local PostgreSQL.
 
@@ -186,10 +298,10 @@ def _get_current_positions() -> str:
     """
     try:
         result = execute_query(
-            "SELECT * FROM positions WHERE status = %s",
+            f"SELECT {_POSITION_COLUMNS} FROM positions WHERE status = %s",
             ("open",)
         )
-        return json.dumps([dict(r) for r in result], indent=2, default=str)
+        return orjson.dumps(result, default=str).decode()
 
     except Exception as e:
         return f"Error fetching positions: {str(e)}"
@@ -202,8 +314,8 @@ def _get_watchlist() -> str:
         JSON string with watchlist stocks
     """
     try:
-        result = execute_query("SELECT * FROM watchlist")
-        return json.dumps([dict(r) for r in result], indent=2, default=str)
+        result = execute_query("SELECT ticker, status, sentiment_score FROM watchlist")
+        return orjson.dumps(result, default=str).decode()
 
     except Exception as e:
         return f"Error fetching watchlist: {str(e)}"
@@ -220,7 +332,7 @@ def _update_position(position_id: int, updates_json: str) -> str:
         Confirmation message
     """
     try:
-        updates = json.loads(updates_json)
+        updates = orjson.loads(updates_json)
 
         set_clause = ", ".join([f"{k} = %s" for k in updates.keys()])
         values = list(updates.values()) + [position_id]
@@ -244,15 +356,53 @@ def _check_alerts() -> str:
     """
     try:
         result = execute_query(
-            "SELECT * FROM alerts WHERE triggered = %s",
+            "SELECT id, ticker, condition, price FROM alerts WHERE triggered = %s",
             (False,)
         )
-        return json.dumps([dict(r) for r in result], indent=2, default=str)
+        return orjson.dumps(result, default=str).decode()
 
     except Exception as e:
         return f"Error checking alerts: {str(e)}"
 
 
+async def _get_portfolio_overview() -> str:
+    """Gets open positions, the watchlist and triggered alerts in one call.
+
+    The three lookups run concurrently, so this is faster than calling
+    get_current_positions(), get_watchlist() and check_alerts() in turn.
+
+    Returns:
+        JSON string with "positions", "watchlist" and "alerts" keys; a key
+        holds an error message instead of a list if its lookup failed
+    """
+    sections = {
+        "positions": _get_current_positions,
+        "watchlist": _get_watchlist,
+        "alerts": _check_alerts,
+    }
+    results = await asyncio.gather(
+        *(asyncio.to_thread(getter) for getter in sections.values())
+    )
+
+    overview = {}
+    for name, raw in zip(sections, results):
+        try:
+            overview[name] = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            overview[name] = raw
+    return orjson.dumps(overview).decode()
+
+
+def _watchlist_row(ticker: str, status: str, score: float, now: datetime) -> dict:
+    """Map watchlist tool arguments onto watchlist columns."""
+    return {
+        "ticker": ticker.strip().upper(),
+        "status": status,
+        "sentiment_score": score,
+        "last_updated": now,
+    }
+
+
 def _add_to_watchlist(ticker: str, status: str, score: float = 50.0) -> str:
     """Adds or updates a stock in the watchlist.
 
@@ -265,17 +415,8 @@ def _add_to_watchlist(ticker: str, status: str, score: float = 50.0) -> str:
         Confirmation message
     """
     try:
-        # Try update first
-        updated = execute_update(
-            "UPDATE watchlist SET status = %s, sentiment_score = %s, last_updated = NOW() WHERE ticker = %s",
-            (status, score, ticker.upper())
-        )
-        if updated == 0:
-            # Insert if not exists
-            execute_insert(
-                "INSERT INTO watchlist (ticker, status, sentiment_score) VALUES (%s, %s, %s)",
-                (ticker.upper(), status, score)
-            )
+        row = _watchlist_row(ticker, status, score, datetime.now(timezone.utc))
+        table_upsert("watchlist", [row], conflict="ticker")
 
         return f"✓ Added {ticker} to watchlist (status: {status})"
 
@@ -283,6 +424,37 @@ def _add_to_watchlist(ticker: str, status: str, score: float = 50.0) -> str:
         return f"Error adding to watchlist: {str(e)}"
 
 
+def _add_many_to_watchlist(items_json: str) -> str:
+    """Adds or updates several stocks in the watchlist in one call.
+
+    Args:
+        items_json: JSON list of objects with 'ticker', 'status' and an
+            optional 'score' (default 50), e.g.
+            [{"ticker": "NVDA", "status": "Watching", "score": 85}, ...]
+
+    Returns:
+        Confirmation message
+    """
+    try:
+        items = orjson.loads(items_json)
+        if not isinstance(items, list):
+            return "Error adding to watchlist: items_json must be a JSON list"
+
+        now = datetime.now(timezone.utc)
+        # One row per ticker; ON CONFLICT cannot touch the same row twice
+        rows = {}
+        for item in items:
+            row = _watchlist_row(item["ticker"], item["status"], item.get("score", 50.0), now)
+            rows[row["ticker"]] = row
+
+        table_upsert("watchlist", list(rows.values()), conflict="ticker")
+
+        return f"✓ Added {len(rows)} stocks to watchlist"
+
+    except Exception as e:
+        return f"Error adding to watchlist: {str(e)}"
+
+
 # Wrap all functions with FunctionTool for google-adk compatibility
 log_journal = FunctionTool(_log_journal)
 check_market_status = FunctionTool(_check_market_status)
@@ -293,3 +465,5 @@ get_watchlist = FunctionTool(_get_watchlist)
 update_position = FunctionTool(_update_position)
 check_alerts = FunctionTool(_check_alerts)
 add_to_watchlist = FunctionTool(_add_to_watchlist)
+add_many_to_watchlist = FunctionTool(_add_many_to_watchlist)
+get_portfolio_overview = FunctionTool(_get_portfolio_overview)
@@ -13,6 +13,8 @@ from app.agents.tools import (
     update_position,
     check_alerts,
     add_to_watchlist,
+    add_many_to_watchlist,
+    get_portfolio_overview,
 )
 from app.agents.wilson.prompt import WILSON_SYSTEM_PROMPT
 
@@ -41,5 +43,7 @@ root_agent = wilson = Agent(
         update_position,
         check_alerts,
         add_to_watchlist,
+        add_many_to_watchlist,
+        get_portfolio_overview,
     ],
 )
@@ -50,6 +50,10 @@ class Settings(BaseSettings):
     flask_app: str = Field(default="run.py", description="Flask app entry point")
     port: int = Field(default=8080, description="Server port")
     flask_env: str = Field(default="development", description="Flask environment")
+    run_scheduler: bool = Field(
+        default=True,
+        description="Start APScheduler jobs in this process (enable on exactly one process)",
+    )
 
     @model_validator(mode="after")
     def set_litellm_env_vars(self) -> "Settings":
@@ -6,34 +6,39 @@ from flask import (
     Response,
     redirect,
     url_for,
+    current_app,
 )
 from datetime import datetime
+import calendar as cal
 import io
 import csv
 import json
 import os
+import re
+import time
 
 from .utils import (
     get_latest_scan,
+    get_latest_scan_key,
     get_scan_by_id,
     get_all_scans,
     get_settings,
+    get_risk_per_trade,
     update_setting,
     get_all_alerts,
     add_alert,
     delete_alert,
     get_all_earnings,
     set_earnings_date,
-    get_all_positions,
+    get_positions_with_summary,
     add_position,
     update_position,
     delete_position,
-    _positions_summary,
-    get_all_calls,
+    get_calls_with_summary,
+    get_call_by_id,
     add_call,
     update_call,
     delete_call,
-    _calls_summary,
     get_routine,
     save_routine,
     get_all_routine_dates,
@@ -43,6 +48,67 @@ from .utils import (
 # Define Blueprint
 bp = Blueprint("dashboard", __name__)
 
+# 1-10 letters, digits, '.' or '-' (e.g. BRK.B), with at least one letter or digit
+_TICKER_RE = re.compile(r"(?=.*[A-Z0-9])[A-Z0-9.\-]{1,10}")
+
+# Month names resolved once; calendar.month_name formats through strftime on each access
+_MONTH_NAMES = tuple(cal.month_name)
+
+# Rows written per csv.writerows() call / streamed chunk in /api/export
+EXPORT_CHUNK_ROWS = 1024
+
+# ((scan key, risk_per_trade), expires_at, body) for the last /api/data
+# response; the TTL picks up in-place edits the scan key cannot see
+DATA_CACHE_TTL = 15
+_data_cache = (None, 0.0, None)
+
+# (date, "YYYY-MM-DD") for the current local day
+_today_cache = (None, None)
+
+
+def _today_str():
+    """Today's local date as YYYY-MM-DD, formatted once per day."""
+    global _today_cache
+    today = datetime.now().date()
+    if _today_cache[0] != today:
+        _today_cache = (today, today.isoformat())
+    return _today_cache[1]
+
+
+def _conditional_json(obj):
+    """jsonify() with an ETag, answering 304 when If-None-Match still matches.
+
+    no-cache makes the browser revalidate on every poll, so unchanged data
+    costs a bodiless 304 instead of the full payload.
+    """
+    response = jsonify(obj)
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _parse_tickers(raw):
+    """Split a comma-separated ticker list into unique uppercase tickers, in order."""
+    return tuple(dict.fromkeys(t for t in (part.strip().upper() for part in raw.split(",")) if t))
+
+
+def _parse_number(data, key, kind, label, hi, range_hint, positive=True, default=0):
+    """Coerce data[key] with kind (int/float) and bounds-check it.
+
+    The value must be in (0, hi], or [0, hi] when positive is False.
+
+    Returns:
+        (value, None) on success, or (None, (error response, 400))
+    """
+    try:
+        value = kind(data.get(key, default))
+    except (ValueError, TypeError):
+        expected = "an integer" if kind is int else "a number"
+        return None, (jsonify({"error": f"Invalid {label} (must be {expected})"}), 400)
+    if not ((0 < value if positive else 0 <= value) and value <= hi):
+        return None, (jsonify({"error": f"Invalid {label} ({range_hint})"}), 400)
+    return value, None
+
 
 # --- Main Routes ---
 @bp.route("/")
@@ -51,19 +117,24 @@ def index():
     return render_template("index.html")
 
 
-@bp.route("/api/data")
-def api_data():
-    """Return latest scan data as JSON"""
+def _build_data_response():
+    """Latest scan with Shares/Cost filled in, as a JSON response."""
+    global _data_cache
     try:
+        # Polls mostly see the same scan: reuse the last body if neither the
+        # scan nor the risk setting has changed
+        scan_key = get_latest_scan_key()
+        risk_per_trade = get_risk_per_trade()
+        cache_key = (scan_key, risk_per_trade)
+        cached_key, expires_at, cached_body = _data_cache
+        if scan_key is not None and cached_key == cache_key and time.monotonic() < expires_at:
+            return current_app.response_class(cached_body, mimetype="application/json")
+
         scan = get_latest_scan()
         if scan is None:
             return jsonify({"error": "No scans found"}), 404
 
         # Calculate Shares and Cost for each stock
-        settings = get_settings()
-        account_equity = float(settings.get("account_equity") or 100000)
-        risk_pct = float(settings.get("risk_pct") or 0.01)
-        risk_per_trade = account_equity * risk_pct
 
         for stock in scan.get("scan_stocks", []):
             try:
@@ -81,15 +152,25 @@ def api_data():
                 stock["Shares"] = ""
                 stock["Cost"] = ""
 
-        return jsonify(scan)
+        response = jsonify(scan)
+        # Only cache if the scan fetched is the one the key describes
+        if scan_key is not None and scan_key[:2] == (scan.get("id"), len(scan.get("scan_stocks", []))):
+            _data_cache = (cache_key, time.monotonic() + DATA_CACHE_TTL, response.get_data())
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@bp.route("/api/data")
+def api_data():
+    """Return latest scan data as JSON"""
+    return _build_data_response()
+
+
 @bp.route("/api/refresh")
 def api_refresh():
     """Force refresh (no-op now, just returns latest data)"""
-    return api_data()
+    return _build_data_response()
 
 
 @bp.route("/api/export")
@@ -102,30 +183,48 @@ def api_export():
     # Get filter parameter if provided
     filter_text = request.args.get("filter", "").lower()
 
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Write headers
     headers = data.get("headers", [])
-    writer.writerow(headers)
-
-    # Write stock data
     stocks = data.get("stocks", [])
-    for stock in stocks:
-        # Apply filter if provided
-        if filter_text:
-            ticker = stock.get("Ticker", "").lower()
-            if filter_text not in ticker:
-                continue
-
-        row = [stock.get(header, "") for header in headers]
-        writer.writerow(row)
-
-    # Prepare response
-    output.seek(0)
+    if filter_text:
+        # Check the filter once here rather than on every row
+        matching = (
+            stock for stock in stocks
+            if filter_text in stock.get("Ticker", "").lower()
+        )
+    else:
+        matching = stocks
+
+    def generate():
+        # Reuse one small buffer, writing and yielding rows in batches
+        output = io.StringIO()
+        writer = csv.writer(output)
+
+        def flush():
+            lines = output.getvalue()
+            output.seek(0)
+            output.truncate()
+            return lines
+
+        writer.writerow(headers)
+        yield flush()
+
+        # Bind the per-cell lookups to locals for the row loop
+        get = dict.get
+        columns = tuple(headers)
+        chunk = []
+        for stock in matching:
+            chunk.append([get(stock, header, "") for header in columns])
+            if len(chunk) >= EXPORT_CHUNK_ROWS:
+                writer.writerows(chunk)
+                chunk.clear()
+                yield flush()
+
+        if chunk:
+            writer.writerows(chunk)
+            yield flush()
+
     return Response(
-        output.getvalue(),
+        generate(),
         mimetype="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename=canslim_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -137,7 +236,7 @@ def api_export():
 @bp.route("/api/alerts", methods=["GET"])
 def get_alerts():
     """Get all alerts"""
-    return jsonify(get_all_alerts())
+    return _conditional_json(get_all_alerts())
 
 
 @bp.route("/api/alerts", methods=["POST"])
@@ -148,11 +247,7 @@ def add_alert_api():
 
         # Validate ticker
         ticker = data.get("ticker", "").strip().upper()
-        if (
-            not ticker
-            or len(ticker) > 10
-            or not ticker.replace(".", "").replace("-", "").isalnum()
-        ):
+        if not _TICKER_RE.fullmatch(ticker):
             return jsonify({"error": "Invalid ticker (max 10 alphanumeric chars)"}), 400
 
         # Validate condition
@@ -161,14 +256,11 @@ def add_alert_api():
             return jsonify({"error": "Invalid condition (must be above or below)"}), 400
 
         # Validate price
-        try:
-            price = float(data.get("price", 0))
-            if price <= 0 or price > 1000000:
-                return jsonify(
-                    {"error": "Invalid price (must be positive, max $1M)"}
-                ), 400
-        except (ValueError, TypeError):
-            return jsonify({"error": "Invalid price (must be a number)"}), 400
+        price, error = _parse_number(
+            data, "price", float, "price", 1000000, "must be positive, max $1M"
+        )
+        if error:
+            return error
 
         alert = add_alert(ticker, condition, price)
         if alert:
@@ -196,7 +288,7 @@ def delete_alert_api(alert_id):
 @bp.route("/api/earnings", methods=["GET"])
 def get_earnings():
     """Get all earnings dates"""
-    return jsonify(get_all_earnings())
+    return _conditional_json(get_all_earnings())
 
 
 @bp.route("/api/earnings", methods=["POST"])
@@ -225,7 +317,7 @@ def get_history():
     """List all historical scans"""
     try:
         scans = get_all_scans(limit=100)
-        return jsonify(scans)
+        return _conditional_json(scans)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -246,7 +338,7 @@ def get_historical_scan(scan_id):
 @bp.route("/api/settings", methods=["GET"])
 def get_settings_api():
     """Get scanner settings"""
-    return jsonify(get_settings())
+    return _conditional_json(get_settings())
 
 
 @bp.route("/api/settings", methods=["POST"])
@@ -269,7 +361,7 @@ def update_settings_api():
 # --- Daily Trading Routine ---
 @bp.route("/routine")
 def routine_today():
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = _today_str()
     return redirect(url_for("dashboard.routine_view", date_str=today))
 
 
@@ -298,9 +390,6 @@ def routine_form(date_str, routine_type):
     )
 
 
-import calendar as cal
-
-
 @bp.route("/calendar")
 @bp.route("/calendar/<int:year>/<int:month>")
 def calendar_view(year=None, month=None):
@@ -310,27 +399,25 @@ def calendar_view(year=None, month=None):
     if month is None:
         month = today.month
     weeks = cal.monthcalendar(year, month)
-    num_days = cal.monthrange(year, month)[1]
     all_dates = get_all_routine_dates()
-    days_data = {}
-    for day in range(1, num_days + 1):
-        ds = f"{year}-{month:02d}-{day:02d}"
-        if ds in all_dates:
-            days_data[day] = all_dates[ds]
+    prefix = f"{year}-{month:02d}-"
+    days_data = {
+        int(ds[8:10]): flags for ds, flags in all_dates.items() if ds.startswith(prefix)
+    }
     prev_year, prev_month = (year - 1, 12) if month == 1 else (year, month - 1)
     next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
     return render_template(
         "calendar.html",
         year=year,
         month=month,
-        month_name=cal.month_name[month],
+        month_name=_MONTH_NAMES[month],
         weeks=weeks,
         days_data=days_data,
         prev_year=prev_year,
         prev_month=prev_month,
         next_year=next_year,
         next_month=next_month,
-        today_str=today.strftime("%Y-%m-%d"),
+        today_str=_today_str(),
     )
 
 
@@ -358,8 +445,8 @@ def calls_page():
 
 @bp.route("/api/calls", methods=["GET"])
 def api_calls_get():
-    trades = get_all_calls()
-    return jsonify({"trades": trades, "summary": _calls_summary(trades)})
+    trades, summary = get_calls_with_summary()
+    return _conditional_json({"trades": trades, "summary": summary})
 
 
 @bp.route("/api/calls", methods=["POST"])
@@ -369,42 +456,30 @@ def api_calls_add():
 
         # Validate ticker
         ticker = data.get("ticker", "SPY").strip().upper()
-        if (
-            not ticker
-            or len(ticker) > 10
-            or not ticker.replace(".", "").replace("-", "").isalnum()
-        ):
+        if not _TICKER_RE.fullmatch(ticker):
             return jsonify({"error": "Invalid ticker (max 10 alphanumeric chars)"}), 400
 
-        # Validate contracts
-        try:
-            contracts = int(data.get("contracts", 1))
-            if contracts <= 0 or contracts > 10000:
-                return jsonify({"error": "Invalid contracts (must be 1-10,000)"}), 400
-        except (ValueError, TypeError):
-            return jsonify({"error": "Invalid contracts (must be an integer)"}), 400
-
-        # Validate premium_per_contract
-        try:
-            premium_per = float(data.get("premium_per_contract", 0))
-            if premium_per < 0 or premium_per > 10000:
-                return jsonify({"error": "Invalid premium (must be 0-$10,000)"}), 400
-        except (ValueError, TypeError):
-            return jsonify({"error": "Invalid premium (must be a number)"}), 400
-
-        # Validate strike
-        try:
-            strike = float(data.get("strike", 0))
-            if strike <= 0 or strike > 100000:
-                return jsonify(
-                    {"error": "Invalid strike (must be positive, max $100k)"}
-                ), 400
-        except (ValueError, TypeError):
-            return jsonify({"error": "Invalid strike (must be a number)"}), 400
+        # Validate contracts, premium_per_contract and strike
+        contracts, error = _parse_number(
+            data, "contracts", int, "contracts", 10000, "must be 1-10,000", default=1
+        )
+        if error:
+            return error
+        premium_per, error = _parse_number(
+            data, "premium_per_contract", float, "premium", 10000, "must be 0-$10,000",
+            positive=False,
+        )
+        if error:
+            return error
+        strike, error = _parse_number(
+            data, "strike", float, "strike", 100000, "must be positive, max $100k"
+        )
+        if error:
+            return error
 
         trade = {
             "ticker": ticker,
-            "sell_date": data.get("sell_date", datetime.now().strftime("%Y-%m-%d")),
+            "sell_date": data.get("sell_date", _today_str()),
             "expiry": data.get("expiry", ""),
             "strike": strike,
             "contracts": contracts,
@@ -432,22 +507,14 @@ def api_calls_add():
 def api_calls_close(call_id):
     try:
         data = request.json
-        calls = get_all_calls()
-
-        # Find the call to update
-        trade = None
-        for t in calls:
-            if t.get("id") == call_id:
-                trade = t
-                break
-
+        trade = get_call_by_id(call_id)
         if not trade:
             return jsonify({"error": "Call not found"}), 404
 
         status = data.get("status", "expired")
         updates = {
             "status": status,
-            "close_date": data.get("close_date", datetime.now().strftime("%Y-%m-%d")),
+            "close_date": data.get("close_date", _today_str()),
         }
 
         if status == "expired":
@@ -492,14 +559,14 @@ def health():
 # --- Trade Tracker: Stock Positions ---
 @bp.route("/api/positions", methods=["GET"])
 def api_positions_get():
-    positions = get_all_positions()
-    return jsonify({"positions": positions, "summary": _positions_summary(positions)})
+    positions, summary = get_positions_with_summary()
+    return jsonify({"positions": positions, "summary": summary})
 
 
 @bp.route("/api/quotes", methods=["GET"])
 def api_quotes():
     """Get current prices for a list of tickers (requires external API setup)"""
-    tickers = request.args.get("tickers", "")
+    tickers = _parse_tickers(request.args.get("tickers", ""))
     if not tickers:
         return jsonify({})
     return jsonify({"error": "Market data API not configured"}), 501
@@ -512,30 +579,20 @@ def api_positions_add():
 
         # Validate ticker
         ticker = data.get("ticker", "").strip().upper()
-        if (
-            not ticker
-            or len(ticker) > 10
-            or not ticker.replace(".", "").replace("-", "").isalnum()
-        ):
+        if not _TICKER_RE.fullmatch(ticker):
             return jsonify({"error": "Invalid ticker (max 10 alphanumeric chars)"}), 400
 
-        # Validate shares
-        try:
-            shares = int(data.get("shares", 0))
-            if shares <= 0 or shares > 1000000:
-                return jsonify({"error": "Invalid shares (must be 1-1,000,000)"}), 400
-        except (ValueError, TypeError):
-            return jsonify({"error": "Invalid shares (must be an integer)"}), 400
-
-        # Validate entry_price
-        try:
-            entry_price = float(data.get("entry_price", 0))
-            if entry_price <= 0 or entry_price > 100000:
-                return jsonify(
-                    {"error": "Invalid entry price (must be positive, max $100k)"}
-                ), 400
-        except (ValueError, TypeError):
-            return jsonify({"error": "Invalid entry price (must be a number)"}), 400
+        # Validate shares and entry_price
+        shares, error = _parse_number(
+            data, "shares", int, "shares", 1000000, "must be 1-1,000,000"
+        )
+        if error:
+            return error
+        entry_price, error = _parse_number(
+            data, "entry_price", float, "entry price", 100000, "must be positive, max $100k"
+        )
+        if error:
+            return error
 
         # Validate optional prices
         stop_price = float(data.get("stop_price", 0)) if data.get("stop_price") else 0
@@ -552,7 +609,7 @@ def api_positions_add():
             "ticker": ticker,
             "account": data.get("account", "default"),
             "trade_type": trade_type,
-            "entry_date": data.get("entry_date", datetime.now().strftime("%Y-%m-%d")),
+            "entry_date": data.get("entry_date", _today_str()),
             "entry_price": entry_price,
             "shares": shares,
             "cost_basis": round(shares * entry_price, 2),
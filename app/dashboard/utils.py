@@ -1,5 +1,7 @@
 import json
 import os
+import threading
+import time
 
 # Configuration
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
@@ -13,6 +15,45 @@ DEFAULT_SETTINGS = {
     'max_positions': 6
 }
 
+# Per-process read cache for data the dashboard reads far more often than it
+# changes. The write helpers below drop their entry; the TTL bounds how long
+# writes made elsewhere (agents, other workers) can go unseen.
+READ_CACHE_TTL = 15  # positions, covered calls
+SETTINGS_TTL = 30
+EARNINGS_TTL = 300
+ROUTINE_DATES_TTL = 60
+_read_cache = {}
+_read_generations = {}
+_read_cache_lock = threading.Lock()
+
+
+def _cached_read(name, load, ttl=READ_CACHE_TTL):
+    """Return load() from the per-process read cache, reloading when expired.
+
+    If load() raises, nothing is cached and the exception propagates. A load
+    that overlaps an invalidation is returned but not cached, so a read that
+    started before a write cannot put the pre-write value back.
+    """
+    with _read_cache_lock:
+        entry = _read_cache.get(name)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        generation = _read_generations.get(name, 0)
+
+    value = load()
+    with _read_cache_lock:
+        if _read_generations.get(name, 0) == generation:
+            _read_cache[name] = (time.monotonic() + ttl, value)
+    return value
+
+
+def _invalidate_read(name):
+    """Drop a read cache entry after a write."""
+    with _read_cache_lock:
+        _read_cache.pop(name, None)
+        _read_generations[name] = _read_generations.get(name, 0) + 1
+
+
 # Database helpers
 def _get_db():
     """Get database module (lazy import to avoid circular dependency)"""
@@ -30,31 +71,57 @@ def _json_serialize(obj):
 
 
 # Scan helpers
+# Scan row plus its stocks (as a JSON array, oldest first) in one round trip
+_SCAN_WITH_STOCKS = """
+    SELECT s.*,
+           COALESCE(
+               (SELECT json_agg(ss ORDER BY ss.created_at)
+                FROM scan_stocks ss WHERE ss.scan_id = s.id),
+               '[]'::json
+           ) AS scan_stocks
+    FROM scans s
+"""
+
+
 def get_latest_scan():
     """Get most recent CANSLIM scan with stocks."""
     from app.db import execute_query
 
     try:
-        # Get the latest scan
         scans = execute_query(
-            "SELECT * FROM scans ORDER BY created_at DESC LIMIT 1"
+            _SCAN_WITH_STOCKS + "ORDER BY s.created_at DESC LIMIT 1"
         )
+        return scans[0] if scans else None
+    except Exception as e:
+        print(f"Error fetching latest scan: {e}")
+        return None
 
-        if not scans:
-            return None
 
-        scan = dict(scans[0])
+def get_latest_scan_key():
+    """Get (id, stock_count, last_stock_at) of the most recent scan, or None.
 
-        # Get stocks for this scan
-        stocks = execute_query(
-            "SELECT * FROM scan_stocks WHERE scan_id = %s ORDER BY created_at",
-            (scan['id'],)
-        )
+    Cheap to query, and changes when a new scan lands or stocks are added
+    to or replaced in it (a delete+insert moves last_stock_at). In-place
+    UPDATEs of scan_stocks rows leave it unchanged, so callers caching on
+    it should also expire their copy after a short TTL.
+    """
+    from app.db import execute_query
 
-        scan['scan_stocks'] = [dict(s) for s in stocks]
-        return scan
+    try:
+        rows = execute_query(
+            """SELECT s.id, st.stock_count, st.last_stock_at
+               FROM scans s
+               CROSS JOIN LATERAL (
+                   SELECT COUNT(*) AS stock_count, MAX(created_at) AS last_stock_at
+                   FROM scan_stocks WHERE scan_id = s.id
+               ) st
+               ORDER BY s.created_at DESC LIMIT 1"""
+        )
+        if not rows:
+            return None
+        return rows[0]['id'], rows[0]['stock_count'], rows[0]['last_stock_at']
     except Exception as e:
-        print(f"Error fetching latest scan: {e}")
+        print(f"Error fetching latest scan key: {e}")
         return None
 
 
@@ -64,23 +131,10 @@ def get_scan_by_id(scan_id):
 
     try:
         scans = execute_query(
-            "SELECT * FROM scans WHERE id = %s",
+            _SCAN_WITH_STOCKS + "WHERE s.id = %s",
             (scan_id,)
         )
-
-        if not scans:
-            return None
-
-        scan = dict(scans[0])
-
-        # Get stocks for this scan
-        stocks = execute_query(
-            "SELECT * FROM scan_stocks WHERE scan_id = %s ORDER BY created_at",
-            (scan_id,)
-        )
-
-        scan['scan_stocks'] = [dict(s) for s in stocks]
-        return scan
+        return scans[0] if scans else None
     except Exception as e:
         print(f"Error fetching scan {scan_id}: {e}")
         return None
@@ -95,48 +149,72 @@ def get_all_scans(limit=50):
             "SELECT id, created_at, scan_time, market_regime, actionable_count FROM scans ORDER BY created_at DESC LIMIT %s",
             (limit,)
         )
-        return [dict(r) for r in result]
+        return result
     except Exception as e:
         print(f"Error fetching scans: {e}")
         return []
 
 
 # Settings helpers
-def get_settings():
-    """Get all settings as dict."""
+def _with_risk_per_trade(settings):
+    """Pair settings with the dollar risk per trade they imply."""
+    account_equity = float(settings.get('account_equity') or 100000)
+    risk_pct = float(settings.get('risk_pct') or 0.01)
+    return settings, account_equity * risk_pct
+
+
+def _load_settings():
+    """Read all settings from the database, merged with defaults."""
     from app.db import execute_query
 
+    result = execute_query("SELECT * FROM settings")
+    settings = {row['key']: row['value'] for row in result}
+    # Merge with defaults for missing keys
+    for k, v in DEFAULT_SETTINGS.items():
+        if k not in settings:
+            settings[k] = v
+    return _with_risk_per_trade(settings)
+
+
+def _cached_settings():
+    """Return the cached (settings, risk_per_trade) pair, reloading when stale."""
     try:
-        result = execute_query("SELECT * FROM settings")
-        settings = {row['key']: row['value'] for row in result}
-        # Merge with defaults for missing keys
-        for k, v in DEFAULT_SETTINGS.items():
-            if k not in settings:
-                settings[k] = v
-        return settings
+        return _cached_read('settings', _load_settings, SETTINGS_TTL)
     except Exception as e:
         print(f"Error fetching settings: {e}")
-        return DEFAULT_SETTINGS.copy()
+        return _with_risk_per_trade(DEFAULT_SETTINGS.copy())
+
+
+def clear_settings_cache():
+    """Force the next settings read to go to the database."""
+    _invalidate_read('settings')
+
+
+def get_settings():
+    """Get all settings as dict."""
+    settings, _ = _cached_settings()
+    return dict(settings)
+
+
+def get_risk_per_trade():
+    """Get the dollar risk per trade (account_equity * risk_pct)."""
+    _, risk_per_trade = _cached_settings()
+    return risk_per_trade
 
 
 def update_setting(key, value):
     """Update a single setting."""
-    from app.db import execute_update
+    from app.db import execute_update, to_json
 
     try:
-        value_json = json.dumps(value) if not isinstance(value, str) else value
-        # Try update first
-        updated = execute_update(
-            "UPDATE settings SET value = %s, updated_at = NOW() WHERE key = %s",
-            (value_json, key)
+        value_json = to_json(value) if not isinstance(value, str) else value
+        execute_update(
+            """INSERT INTO settings (key, value, updated_at) VALUES (%s, %s, NOW())
+               ON CONFLICT (key)
+               DO UPDATE SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at""",
+            (key, value_json)
         )
-        if updated == 0:
-            # Insert if not exists
-            from app.db import execute_insert
-            execute_insert(
-                "INSERT INTO settings (key, value) VALUES (%s, %s)",
-                (key, value_json)
-            )
+        clear_settings_cache()
         return True
     except Exception as e:
         print(f"Error updating setting {key}: {e}")
@@ -152,7 +230,7 @@ def get_all_alerts():
         result = execute_query(
             "SELECT * FROM alerts ORDER BY created_at DESC"
         )
-        return [dict(r) for r in result]
+        return result
     except Exception as e:
         print(f"Error fetching alerts: {e}")
         return []
@@ -160,14 +238,14 @@ def get_all_alerts():
 
 def add_alert(ticker, condition, price):
     """Add new alert."""
-    from app.db import execute_insert
+    from app.db import execute_query
 
     try:
-        result = execute_insert(
+        result = execute_query(
             "INSERT INTO alerts (ticker, condition, price, triggered) VALUES (%s, %s, %s, %s) RETURNING *",
             (ticker.upper(), condition, float(price), False)
         )
-        return dict(result) if result else None
+        return result[0] if result else None
     except Exception as e:
         print(f"Error adding alert: {e}")
         return None
@@ -193,9 +271,12 @@ def get_all_earnings():
     """Get earnings calendar."""
     from app.db import execute_query
 
-    try:
+    def load():
         result = execute_query("SELECT * FROM earnings")
         return {row['ticker']: row['earnings_date'] for row in result}
+
+    try:
+        return dict(_cached_read('earnings', load, EARNINGS_TTL))
     except Exception as e:
         print(f"Error fetching earnings: {e}")
         return {}
@@ -203,20 +284,16 @@ def get_all_earnings():
 
 def set_earnings_date(ticker, date):
     """Set earnings date for ticker."""
-    from app.db import execute_update, execute_insert
+    from app.db import execute_update
 
     try:
-        # Try update first
-        updated = execute_update(
-            "UPDATE earnings SET earnings_date = %s, updated_at = NOW() WHERE ticker = %s",
-            (date, ticker.upper())
+        execute_update(
+            """INSERT INTO earnings (ticker, earnings_date, updated_at) VALUES (%s, %s, NOW())
+               ON CONFLICT (ticker)
+               DO UPDATE SET earnings_date = EXCLUDED.earnings_date, updated_at = EXCLUDED.updated_at""",
+            (ticker.upper(), date)
         )
-        if updated == 0:
-            # Insert if not exists
-            execute_insert(
-                "INSERT INTO earnings (ticker, earnings_date) VALUES (%s, %s)",
-                (ticker.upper(), date)
-            )
+        _invalidate_read('earnings')
         return True
     except Exception as e:
         print(f"Error setting earnings for {ticker}: {e}")
@@ -238,15 +315,34 @@ def get_all_positions(status=None):
             result = execute_query(
                 "SELECT * FROM positions ORDER BY entry_date DESC"
             )
-        return [dict(r) for r in result]
+        return result
     except Exception as e:
         print(f"Error fetching positions: {e}")
         return []
 
 
+def get_positions_with_summary():
+    """Get all positions and their summary (cached for READ_CACHE_TTL seconds).
+
+    Rows and summary are copies, so callers may modify them freely.
+    """
+    from app.db import execute_query
+
+    def load():
+        positions = execute_query("SELECT * FROM positions ORDER BY entry_date DESC")
+        return positions, _positions_summary(positions)
+
+    try:
+        rows, summary = _cached_read('positions', load)
+        return [dict(r) for r in rows], dict(summary)
+    except Exception as e:
+        print(f"Error fetching positions: {e}")
+        return [], _positions_summary([])
+
+
 def add_position(position_data):
     """Add new position."""
-    from app.db import execute_insert
+    from app.db import execute_query
 
     try:
         # Map field names to DB columns
@@ -257,11 +353,12 @@ def add_position(position_data):
         for col in columns:
             values.append(position_data.get(col))
 
-        result = execute_insert(
+        result = execute_query(
             f"INSERT INTO positions ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) RETURNING *",
             tuple(values)
         )
-        return dict(result) if result else None
+        _invalidate_read('positions')
+        return result[0] if result else None
     except Exception as e:
         print(f"Error adding position: {e}")
         return None
@@ -282,13 +379,14 @@ def update_position(position_id, updates):
             f"UPDATE positions SET {set_clause} WHERE id = %s",
             tuple(values)
         )
+        _invalidate_read('positions')
 
         # Return updated position
         result = execute_query(
             "SELECT * FROM positions WHERE id = %s",
             (position_id,)
         )
-        return dict(result[0]) if result else None
+        return result[0] if result else None
     except Exception as e:
         print(f"Error updating position: {e}")
         return None
@@ -303,6 +401,7 @@ def delete_position(position_id):
             "DELETE FROM positions WHERE id = %s",
             (position_id,)
         )
+        _invalidate_read('positions')
         return True
     except Exception as e:
         print(f"Error deleting position: {e}")
@@ -331,15 +430,55 @@ def get_all_calls():
         result = execute_query(
             "SELECT * FROM covered_calls ORDER BY sell_date DESC"
         )
-        return [dict(r) for r in result]
+        return result
     except Exception as e:
         print(f"Error fetching calls: {e}")
         return []
 
 
+def get_calls_with_summary():
+    """Get all covered calls and their summary (cached for READ_CACHE_TTL seconds).
+
+    Rows and summary (including its per-ticker summaries) are copies, so
+    callers may modify them freely.
+    """
+    from app.db import execute_query
+
+    def load():
+        trades = execute_query("SELECT * FROM covered_calls ORDER BY sell_date DESC")
+        return trades, _calls_summary(trades)
+
+    try:
+        rows, summary = _cached_read('calls', load)
+        summary = dict(
+            summary,
+            tickers=list(summary['tickers']),
+            by_ticker={tk: dict(s) for tk, s in summary['by_ticker'].items()},
+        )
+        return [dict(r) for r in rows], summary
+    except Exception as e:
+        print(f"Error fetching calls: {e}")
+        return [], _calls_summary([])
+
+
+def get_call_by_id(call_id):
+    """Get a single covered call by ID."""
+    from app.db import execute_query
+
+    try:
+        result = execute_query(
+            "SELECT * FROM covered_calls WHERE id = %s",
+            (call_id,)
+        )
+        return result[0] if result else None
+    except Exception as e:
+        print(f"Error fetching call {call_id}: {e}")
+        return None
+
+
 def add_call(call_data):
     """Add new covered call."""
-    from app.db import execute_insert
+    from app.db import execute_query
 
     try:
         columns = ['ticker', 'sell_date', 'expiry', 'strike', 'contracts',
@@ -349,11 +488,12 @@ def add_call(call_data):
         for col in columns:
             values.append(call_data.get(col))
 
-        result = execute_insert(
+        result = execute_query(
             f"INSERT INTO covered_calls ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) RETURNING *",
             tuple(values)
         )
-        return dict(result) if result else None
+        _invalidate_read('calls')
+        return result[0] if result else None
     except Exception as e:
         print(f"Error adding call: {e}")
         return None
@@ -374,13 +514,14 @@ def update_call(call_id, updates):
             f"UPDATE covered_calls SET {set_clause} WHERE id = %s",
             tuple(values)
         )
+        _invalidate_read('calls')
 
         # Return updated call
         result = execute_query(
             "SELECT * FROM covered_calls WHERE id = %s",
             (call_id,)
         )
-        return dict(result[0]) if result else None
+        return result[0] if result else None
     except Exception as e:
         print(f"Error updating call: {e}")
         return None
@@ -395,6 +536,7 @@ def delete_call(call_id):
             "DELETE FROM covered_calls WHERE id = %s",
             (call_id,)
         )
+        _invalidate_read('calls')
         return True
     except Exception as e:
         print(f"Error deleting call: {e}")
@@ -408,35 +550,51 @@ def _calls_summary(trades):
             return {'total_premium': 0, 'total_pnl': 0, 'total_trades': 0,
                     'expired': 0, 'called_away': 0, 'open': 0,
                     'weekly_avg': 0, 'annualized_yield': 0}
-        total_premium = sum(t.get('premium_total', 0) for t in subset)
-        closed = [t for t in subset if t.get('status') != 'open']
-        total_pnl = sum(t.get('pnl', t.get('premium_total', 0)) for t in closed)
-        open_t = [t for t in subset if t.get('status') == 'open']
-        expired = [t for t in subset if t.get('status') == 'expired']
-        called = [t for t in subset if t.get('status') == 'called_away']
-        if subset:
-            dates = sorted(set(t.get('sell_date', '')[:7] for t in subset if t.get('sell_date')))
-            months = max(len(dates), 1)
-            annualized = (total_premium / months) * 12 / max(capital, 1) * 100
-        else:
-            annualized = 0
+        # One pass over the trades; amounts are collected and totalled with
+        # sum(). premium_total/pnl are NUMERIC columns, so they arrive as
+        # Decimal and add exactly; float inputs get sum()'s compensated
+        # summation, which only reduces rounding error
+        premiums = []
+        pnls = []
+        n_open = n_expired = n_called = 0
+        months = set()
+        for t in subset:
+            premium = t.get('premium_total', 0)
+            premiums.append(premium)
+            status = t.get('status')
+            if status == 'open':
+                n_open += 1
+            else:
+                pnls.append(t.get('pnl', premium))
+                if status == 'expired':
+                    n_expired += 1
+                elif status == 'called_away':
+                    n_called += 1
+            sell_date = t.get('sell_date')
+            if sell_date:
+                # sell_date is a DATE (datetime.date) from the DB, or a string
+                months.add(str(sell_date)[:7])
+        total_premium = sum(premiums)
+        total_pnl = sum(pnls)
+        annualized = (total_premium / max(len(months), 1)) * 12 / max(capital, 1) * 100
         return {
             'total_premium': total_premium,
             'total_pnl': total_pnl,
             'total_trades': len(subset),
-            'expired': len(expired),
-            'called_away': len(called),
-            'open': len(open_t),
+            'expired': n_expired,
+            'called_away': n_called,
+            'open': n_open,
             'weekly_avg': total_premium / max(len(subset), 1),
             'annualized_yield': annualized,
         }
 
     overall = _summarize(trades)
-    tickers = sorted(set(t.get('ticker', 'SPY') for t in trades)) if trades else []
-    by_ticker = {}
-    for tk in tickers:
-        subset = [t for t in trades if t.get('ticker', 'SPY') == tk]
-        by_ticker[tk] = _summarize(subset, 100000)
+    # Bucket by ticker in one pass rather than re-filtering per ticker
+    buckets = {}
+    for t in trades:
+        buckets.setdefault(t.get('ticker', 'SPY'), []).append(t)
+    tickers = sorted(buckets)
+    by_ticker = {tk: _summarize(buckets[tk], 100000) for tk in tickers}
 
     overall['tickers'] = tickers
     overall['by_ticker'] = by_ticker
@@ -465,23 +623,17 @@ def get_routine(date_str):
 
 def save_routine(date_str, routine_type, data):
     """Save routine data."""
-    from app.db import execute_update, execute_insert
-    import json
+    from app.db import execute_update, to_json
 
     try:
-        data_json = json.dumps(data) if not isinstance(data, str) else data
-
-        # Try update first
-        updated = execute_update(
-            "UPDATE routines SET data = %s, updated_at = NOW() WHERE date = %s AND routine_type = %s",
-            (data_json, date_str, routine_type)
+        data_json = to_json(data) if not isinstance(data, str) else data
+        execute_update(
+            """INSERT INTO routines (date, routine_type, data, updated_at) VALUES (%s, %s, %s, NOW())
+               ON CONFLICT (date, routine_type)
+               DO UPDATE SET data = EXCLUDED.data, updated_at = EXCLUDED.updated_at""",
+            (date_str, routine_type, data_json)
         )
-        if updated == 0:
-            # Insert if not exists
-            execute_insert(
-                "INSERT INTO routines (date, routine_type, data) VALUES (%s, %s, %s)",
-                (date_str, routine_type, data_json)
-            )
+        _invalidate_read('routine_dates')
         return True
     except Exception as e:
         print(f"Error saving routine: {e}")
@@ -492,14 +644,15 @@ def get_all_routine_dates():
     """Get set of dates that have routine records."""
     from app.db import execute_query
 
-    try:
+    def load():
         result = execute_query(
             "SELECT date, routine_type FROM routines"
         )
 
         dates = {}
         for row in result:
-            ds = row['date']
+            # DATE columns come back as datetime.date; key by YYYY-MM-DD
+            ds = str(row['date'])
             if ds not in dates:
                 dates[ds] = {'has_premarket': False, 'has_postclose': False}
             if row['routine_type'] == 'premarket':
@@ -507,6 +660,10 @@ def get_all_routine_dates():
             elif row['routine_type'] == 'postclose':
                 dates[ds]['has_postclose'] = True
         return dates
+
+    try:
+        dates = _cached_read('routine_dates', load, ROUTINE_DATES_TTL)
+        return {ds: dict(flags) for ds, flags in dates.items()}
     except Exception as e:
         print(f"Error fetching routine dates: {e}")
         return {}
@@ -4,49 +4,87 @@ Replaces Supabase client with direct PostgreSQL connections.
 """
 
 import os
+import threading
 from contextlib import contextmanager
 from functools import lru_cache
 from typing import Any, Optional
 
+import orjson
 import psycopg2
 from psycopg2 import pool
-from psycopg2.extras import RealDictCursor, RealDictRow
+from psycopg2.extras import (
+    Json,
+    RealDictCursor,
+    RealDictRow,
+    execute_values,
+    register_default_json,
+    register_default_jsonb,
+)
+
+# Decode json/jsonb columns (settings, routines, json_agg results) with orjson
+register_default_json(globally=True, loads=orjson.loads)
+register_default_jsonb(globally=True, loads=orjson.loads)
 
 # Database connection pool
 _connection_pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+_POOL_MAXCONN = 10
+
+# Admission control for the pool. ThreadedConnectionPool.getconn() does not
+# wait: once all _POOL_MAXCONN connections are checked out it raises PoolError.
+# The scanner's worker threads can outnumber the pool (EDGAR and news lookups
+# fan out per ticker), so get_db_connection() takes a slot first and blocks
+# until a connection is returned rather than failing the lookup.
+_pool_slots = threading.BoundedSemaphore(_POOL_MAXCONN)
+_pool_lock = threading.Lock()
+
+
+def _database_url() -> str:
+    """DATABASE_URL, or a DSN built from the individual DB_* env vars."""
+    database_url = os.environ.get("DATABASE_URL")
+    if database_url:
+        return database_url
+    db_host = os.environ.get("DB_HOST", "localhost")
+    db_port = os.environ.get("DB_PORT", "5432")
+    db_name = os.environ.get("DB_NAME", "deepdiver")
+    db_user = os.environ.get("DB_USER", "deepdiver")
+    db_pass = os.environ.get("DB_PASSWORD", "deepdiver")
+    return f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
 
 
 def get_connection_pool() -> psycopg2.pool.ThreadedConnectionPool:
     """Get or create the database connection pool."""
     global _connection_pool
     if _connection_pool is None:
-        database_url = os.environ.get("DATABASE_URL")
-        if not database_url:
-            # Fallback to individual env vars
-            db_host = os.environ.get("DB_HOST", "localhost")
-            db_port = os.environ.get("DB_PORT", "5432")
-            db_name = os.environ.get("DB_NAME", "deepdiver")
-            db_user = os.environ.get("DB_USER", "deepdiver")
-            db_pass = os.environ.get("DB_PASSWORD", "deepdiver")
-            database_url = f"postgresql://{db_user}:{db_pass}@{db_host}:{db_port}/{db_name}"
-
-        _connection_pool = psycopg2.pool.ThreadedConnectionPool(
-            minconn=1,
-            maxconn=10,
-            dsn=database_url,
-        )
+        # Scan threads can hit this together on first use; build one pool only
+        with _pool_lock:
+            if _connection_pool is None:
+                _connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=_POOL_MAXCONN,
+                    dsn=_database_url(),
+                )
     return _connection_pool
 
 
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+def to_json(value) -> Json:
+    """Adapt a Python value for a json/jsonb parameter, encoded with orjson."""
+    return Json(value, dumps=_orjson_dumps)
+
+
 @contextmanager
 def get_db_connection():
     """Get a database connection from the pool."""
     pool = get_connection_pool()
-    conn = pool.getconn()
-    try:
-        yield conn
-    finally:
-        pool.putconn(conn)
+    with _pool_slots:
+        conn = pool.getconn()
+        try:
+            yield conn
+        finally:
+            pool.putconn(conn)
 
 
 @contextmanager
@@ -71,11 +109,15 @@ def execute_query(query: str, params: tuple = None) -> list[RealDictRow]:
         return cursor.fetchall()
 
 
-def execute_insert(query: str, params: tuple = None) -> str:
-    """Execute an INSERT query and return the inserted ID."""
+def execute_insert(query: str, params: tuple = None) -> Any:
+    """Execute an INSERT query and return the first RETURNING column (e.g. the ID)."""
     with get_db_cursor() as cursor:
         cursor.execute(query, params)
-        return cursor.fetchone()[0] if cursor.description else None
+        if not cursor.description:
+            return None
+        # Rows are RealDictRows (keyed by column name), so row[0] would be a KeyError
+        row = cursor.fetchone()
+        return next(iter(row.values())) if row else None
 
 
 def execute_update(query: str, params: tuple = None) -> int:
@@ -85,6 +127,19 @@ def execute_update(query: str, params: tuple = None) -> int:
         return cursor.rowcount
 
 
+def execute_many(query: str, params_list: list[tuple], page_size: int = 500) -> int:
+    """Execute an INSERT for many rows with multi-row statements.
+
+    query must contain a single VALUES %s placeholder; rows are sent
+    page_size at a time in one transaction. Returns the number of rows.
+    """
+    if not params_list:
+        return 0
+    with get_db_cursor() as cursor:
+        execute_values(cursor, query, params_list, page_size=page_size)
+    return len(params_list)
+
+
 # ============================================================================
 # Table Names
 # ============================================================================
@@ -133,6 +188,26 @@ def table_update(table: str, data: dict, where: str, params: tuple = None) -> in
     return execute_update(query, full_params)
 
 
+def table_upsert(table: str, rows: list[dict], conflict: str, page_size: int = 500) -> int:
+    """Insert rows, updating existing ones on conflict, with multi-row statements.
+
+    Rows are grouped by column set and each group is sent as
+    INSERT ... ON CONFLICT statements of at most page_size rows, all in one
+    transaction.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row.keys()), []).append(tuple(row.values()))
+
+    with get_db_cursor() as cursor:
+        for columns, values in groups.items():
+            updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in columns if col != conflict)
+            action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+            query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s ON CONFLICT ({conflict}) {action}"
+            execute_values(cursor, query, values, page_size=page_size)
+    return len(rows)
+
+
 def table_delete(table: str, where: str, params: tuple = None) -> int:
     """Delete rows from a table."""
     query = f"DELETE FROM {table} WHERE {where}"
@@ -0,0 +1,43 @@
+"""Flask JSON provider backed by orjson.
+
+Serializes jsonify() responses with orjson instead of the stdlib json
+module while keeping Flask's output conventions: dates as RFC 822 strings,
+sorted keys, and Decimal/Markup handled the same way.
+"""
+
+import decimal
+from datetime import date
+
+import orjson
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+_DUMPS_OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(obj):
+    """Serialize the types Flask's default provider handles beyond orjson's."""
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider that encodes with orjson."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_default, option=_DUMPS_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_DUMPS_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
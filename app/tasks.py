@@ -1,6 +1,7 @@
 from app.extensions import scheduler
 from app.agents.wilson import wilson
-from app.agents.curator import curator
+from app.agents.curator import get_curator
+from app.agents.tools import flush_journal
 from datetime import datetime
 import asyncio
 from google.adk.runners import InMemoryRunner
@@ -59,6 +60,7 @@ def task_morning_briefing():
         # Also fetch and print the summary from journal
         try:
             from app.db import execute_query
+            flush_journal()
             result = execute_query("SELECT * FROM journal ORDER BY created_at DESC LIMIT 3")
             if result:
                 print("\n=== Recent Agent Activity ===")
@@ -82,8 +84,8 @@ def task_market_monitor():
 
     prompt = """Monitor the market and current positions:
 
-    1. Check current positions using get_current_positions()
-    2. Check if any alerts have triggered using check_alerts()
+    1. Check current positions and triggered alerts together using get_portfolio_overview()
+    2. Note any alerts that have triggered
     3. Fetch latest prices for positions using fetch_market_data()
     4. If any positions need attention (hit stops, reached targets), log to journal
     5. Update watchlist if you see new opportunities
@@ -150,7 +152,7 @@ def task_curator_daily_scan():
     """
 
     async def run_curator():
-        runner = InMemoryRunner(agent=curator, app_name="deepdiver")
+        runner = InMemoryRunner(agent=get_curator(), app_name="deepdiver")
         session = await runner.session_service.create_session(
             app_name="deepdiver",
             user_id="system",
@@ -175,6 +177,7 @@ def task_curator_daily_scan():
         # Also fetch and print the summary from journal
         try:
             from app.db import execute_query
+            flush_journal()
             result = execute_query("SELECT * FROM journal ORDER BY created_at DESC LIMIT 3")
             if result:
                 print("\n=== Recent Curator Activity ===")
@@ -236,7 +239,7 @@ PART 2: Russell 3000 Progressive Scan
     """
 
     async def run_curator():
-        runner = InMemoryRunner(agent=curator, app_name="deepdiver")
+        runner = InMemoryRunner(agent=get_curator(), app_name="deepdiver")
         session = await runner.session_service.create_session(
             app_name="deepdiver",
             user_id="system",
@@ -261,6 +264,7 @@ PART 2: Russell 3000 Progressive Scan
         # Also fetch and print the summary from journal
         try:
             from app.db import execute_query
+            flush_journal()
             result = execute_query("SELECT * FROM journal ORDER BY created_at DESC LIMIT 3")
             if result:
                 print("\n=== Recent Curator Activity ===")
@@ -312,7 +316,7 @@ def task_curator_monthly_cleanup():
     """
 
     async def run_curator():
-        runner = InMemoryRunner(agent=curator, app_name="deepdiver")
+        runner = InMemoryRunner(agent=get_curator(), app_name="deepdiver")
         session = await runner.session_service.create_session(
             app_name="deepdiver",
             user_id="system",
@@ -337,6 +341,7 @@ def task_curator_monthly_cleanup():
         # Also fetch and print the summary from journal
         try:
             from app.db import execute_query
+            flush_journal()
             result = execute_query("SELECT * FROM journal ORDER BY created_at DESC LIMIT 3")
             if result:
                 print("\n=== Recent Curator Activity ===")
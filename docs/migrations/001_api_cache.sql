@@ -0,0 +1,10 @@
+-- 001: External API response cache (Curator: Finnhub / EDGAR)
+-- Safe to re-run; matches the api_cache table in docs/postgres-schema.sql.
+
+CREATE TABLE IF NOT EXISTS api_cache (
+  endpoint TEXT NOT NULL,
+  cache_key TEXT NOT NULL,
+  fetched_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+  payload JSONB NOT NULL,
+  PRIMARY KEY (endpoint, cache_key)
+);
@@ -0,0 +1,8 @@
+-- 002: Index trading_universe in get_trading_universe's sort order
+-- (score DESC NULLS LAST, ticker) for LIMIT and keyset pages.
+-- idx_trading_universe_score used to cover score DESC alone, so it is dropped
+-- and rebuilt; safe to re-run.
+
+DROP INDEX IF EXISTS idx_trading_universe_score;
+CREATE INDEX idx_trading_universe_score ON trading_universe(score DESC NULLS LAST, ticker);
+CREATE INDEX IF NOT EXISTS idx_trading_universe_active_score ON trading_universe(score DESC NULLS LAST, ticker) WHERE is_active;
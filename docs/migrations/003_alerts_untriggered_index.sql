@@ -0,0 +1,4 @@
+-- 003: Partial index for check_alerts, which only reads untriggered alerts.
+-- Safe to re-run.
+
+CREATE INDEX IF NOT EXISTS idx_alerts_untriggered ON alerts(ticker) WHERE triggered = false;
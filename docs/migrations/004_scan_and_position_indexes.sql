@@ -0,0 +1,11 @@
+-- 004: Indexes for the dashboard's ordered scan and position reads.
+-- idx_scan_stocks_scan_id and idx_positions_status keep their names but gain
+-- a sort column, so they are dropped and rebuilt; safe to re-run.
+
+CREATE INDEX IF NOT EXISTS idx_scans_created_at ON scans(created_at DESC);
+
+DROP INDEX IF EXISTS idx_scan_stocks_scan_id;
+CREATE INDEX idx_scan_stocks_scan_id ON scan_stocks(scan_id, created_at);
+
+DROP INDEX IF EXISTS idx_positions_status;
+CREATE INDEX idx_positions_status ON positions(status, entry_date DESC);
@@ -15,6 +15,8 @@ CREATE TABLE scans (
   actionable_count INT,
   metadata JSONB
 );
+-- Latest scan and scan history read newest-first with LIMIT
+CREATE INDEX idx_scans_created_at ON scans(created_at DESC);
 
 -- 2. Stock Candidates
 CREATE TABLE scan_stocks (
@@ -31,7 +33,8 @@ CREATE TABLE scan_stocks (
   metadata JSONB,
   created_at TIMESTAMPTZ DEFAULT NOW()
 );
-CREATE INDEX idx_scan_stocks_scan_id ON scan_stocks(scan_id);
+-- Stocks for a scan, in insertion order
+CREATE INDEX idx_scan_stocks_scan_id ON scan_stocks(scan_id, created_at);
 CREATE INDEX idx_scan_stocks_ticker ON scan_stocks(ticker);
 
 -- 3. Settings
@@ -55,6 +58,9 @@ CREATE TABLE alerts (
   created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- check_alerts only reads untriggered alerts
+CREATE INDEX idx_alerts_untriggered ON alerts(ticker) WHERE triggered = false;
+
 -- 5. Earnings
 CREATE TABLE earnings (
   ticker TEXT PRIMARY KEY,
@@ -82,7 +88,8 @@ CREATE TABLE positions (
   notes TEXT,
   created_at TIMESTAMPTZ DEFAULT NOW()
 );
-CREATE INDEX idx_positions_status ON positions(status);
+-- Positions by status, newest entry first
+CREATE INDEX idx_positions_status ON positions(status, entry_date DESC);
 
 -- 7. Covered Calls
 CREATE TABLE covered_calls (
@@ -158,4 +165,16 @@ CREATE TABLE trading_universe (
 );
 CREATE INDEX idx_trading_universe_active ON trading_universe(is_active);
 CREATE INDEX idx_trading_universe_category ON trading_universe(category);
-CREATE INDEX idx_trading_universe_score ON trading_universe(score DESC);
+-- Match _get_trading_universe's ORDER BY score DESC NULLS LAST, ticker so
+-- LIMIT and keyset pages are served by an index scan instead of a sort
+CREATE INDEX idx_trading_universe_score ON trading_universe(score DESC NULLS LAST, ticker);
+CREATE INDEX idx_trading_universe_active_score ON trading_universe(score DESC NULLS LAST, ticker) WHERE is_active;
+
+-- 13. External API response cache (Curator: Finnhub / EDGAR)
+CREATE TABLE api_cache (
+  endpoint TEXT NOT NULL,
+  cache_key TEXT NOT NULL,
+  fetched_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+  payload JSONB NOT NULL,
+  PRIMARY KEY (endpoint, cache_key)
+);
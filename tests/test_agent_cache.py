@@ -0,0 +1,31 @@
+"""Tests for the shared agent TTL cache."""
+from unittest.mock import patch
+
+
+class TestTTLCache:
+    """Tests for the in-process TTLCache."""
+
+    def test_returns_none_after_expiry(self):
+        """Entries older than ttl must be treated as missing."""
+        from app.agents.cache import TTLCache
+
+        cache = TTLCache(ttl=60)
+        with patch("app.agents.cache.time.monotonic", return_value=1000.0):
+            cache.set("k", {"v": 1})
+        with patch("app.agents.cache.time.monotonic", return_value=1030.0):
+            assert cache.get("k") == {"v": 1}
+        with patch("app.agents.cache.time.monotonic", return_value=1061.0):
+            assert cache.get("k") is None
+
+    def test_evicts_oldest_when_full(self):
+        """Cache must not grow past maxsize."""
+        from app.agents.cache import TTLCache
+
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
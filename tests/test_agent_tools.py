@@ -0,0 +1,228 @@
+"""Tests for the shared agent tools in app.agents.tools."""
+import orjson
+import pytest
+from datetime import date, datetime
+from unittest.mock import patch, MagicMock
+
+
+class TestNyseHolidays:
+    """Tests for the NYSE closure set built from pandas_market_calendars."""
+
+    def test_includes_2025_holidays(self):
+        from app.agents.tools import _nyse_holidays
+
+        for day in (date(2025, 1, 1), date(2025, 4, 18), date(2025, 6, 19),
+                    date(2025, 11, 27), date(2025, 12, 25)):
+            assert day in _nyse_holidays()
+
+    def test_includes_unscheduled_closures(self):
+        """Special closures like the Jan 9, 2025 national day of mourning count."""
+        from app.agents.tools import _nyse_holidays
+
+        assert date(2025, 1, 9) in _nyse_holidays()
+
+    def test_regular_trading_day_excluded(self):
+        from app.agents.tools import _nyse_holidays
+
+        assert date(2025, 3, 12) not in _nyse_holidays()
+
+    def test_calendar_not_loaded_on_import(self):
+        """Importing the tools leaves pandas_market_calendars for the first check."""
+        import subprocess
+        import sys
+
+        code = ("import sys, app.agents.tools; "
+                "sys.exit('pandas_market_calendars' in sys.modules)")
+        assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+class TestCheckMarketStatus:
+    """Tests for _check_market_status."""
+
+    @pytest.mark.parametrize("moment, status", [
+        (datetime(2025, 3, 12, 9, 29), "CLOSED"),
+        (datetime(2025, 3, 12, 9, 30), "OPEN"),
+        (datetime(2025, 3, 12, 15, 59), "OPEN"),
+        (datetime(2025, 3, 12, 16, 0), "CLOSED"),
+        (datetime(2025, 3, 15, 12, 0), "CLOSED"),  # Saturday
+        (datetime(2025, 11, 27, 12, 0), "CLOSED"),  # Thanksgiving
+        (datetime(2025, 1, 9, 12, 0), "CLOSED"),  # Day of mourning
+    ])
+    def test_status(self, moment, status):
+        """Open only during regular hours on non-holiday weekdays."""
+        from app.agents import tools
+
+        with patch.object(tools, "datetime") as mock_datetime:
+            mock_datetime.now.side_effect = lambda tz: moment.replace(tzinfo=tz)
+            assert tools._check_market_status().startswith(f"Market is {status}")
+
+
+class TestFetchMarketData:
+    """Tests for _fetch_market_data snapshot caching."""
+
+    def test_repeat_request_served_from_cache(self):
+        """The same ticker list within the TTL does not call Alpaca again."""
+        from app.agents import tools
+
+        snapshot = MagicMock()
+        snapshot.latest_trade.price = 100.0
+        snapshot.daily_bar.close = 102.0
+        snapshot.daily_bar.volume = 1000
+        snapshot.daily_bar.high = 103.0
+        snapshot.daily_bar.low = 99.0
+        snapshot.previous_daily_bar.close = 100.0
+        client = MagicMock()
+        client.get_stock_snapshot.return_value = {"NVDA": snapshot}
+
+        tools._MARKET_DATA_CACHE.clear()
+        with patch.object(tools, "_alpaca_data_client", return_value=client):
+            first = tools._fetch_market_data("nvda")
+            second = tools._fetch_market_data("NVDA ")
+
+        assert first == second
+        assert client.get_stock_snapshot.call_count == 1
+        assert '"change_pct":2.0' in first
+
+    def test_reordered_tickers_share_cache_entry(self):
+        """Order, case and duplicates don't split the cache; rows follow the request."""
+        from app.agents import tools
+
+        snapshots = {}
+        for ticker, price in (("NVDA", 100.0), ("AMD", 50.0)):
+            snapshot = MagicMock(daily_bar=None, previous_daily_bar=None)
+            snapshot.latest_trade.price = price
+            snapshots[ticker] = snapshot
+        client = MagicMock()
+        client.get_stock_snapshot.return_value = snapshots
+
+        tools._MARKET_DATA_CACHE.clear()
+        with patch.object(tools, "_alpaca_data_client", return_value=client):
+            first = orjson.loads(tools._fetch_market_data("NVDA,AMD"))
+            second = orjson.loads(tools._fetch_market_data("amd, nvda, AMD"))
+
+        assert client.get_stock_snapshot.call_count == 1
+        assert [row["ticker"] for row in first] == ["NVDA", "AMD"]
+        assert [row["ticker"] for row in second] == ["AMD", "NVDA"]
+
+    def test_missing_daily_bar_reports_zeros(self):
+        """A snapshot without a daily bar still yields a row with zeroed fields."""
+        from app.agents import tools
+
+        snapshot = MagicMock(daily_bar=None, previous_daily_bar=None)
+        snapshot.latest_trade.price = 50.0
+        client = MagicMock()
+        client.get_stock_snapshot.return_value = {"AMD": snapshot}
+
+        tools._MARKET_DATA_CACHE.clear()
+        with patch.object(tools, "_alpaca_data_client", return_value=client):
+            rows = orjson.loads(tools._fetch_market_data("AMD"))
+
+        assert rows == [{"ticker": "AMD", "price": 50.0, "volume": 0, "change_pct": 0.0, "high": 0, "low": 0}]
+
+
+class TestLogJournal:
+    """Tests for buffered journal writes."""
+
+    def test_entries_written_in_one_batch_on_flush(self):
+        """Logged entries are queued and inserted together by flush_journal."""
+        from app.agents import tools
+
+        with patch.object(tools, "_start_journal_flusher"), \
+             patch.object(tools, "execute_many", return_value=2) as mock_many:
+            assert tools._log_journal("Wilson", "Signal", "NVDA breakout") == "Queued for the journal."
+            tools._log_journal("Wilson", "Trade", "Bought NVDA")
+            mock_many.assert_not_called()
+
+            assert tools.flush_journal() == 2
+
+        rows = mock_many.call_args[0][1]
+        assert [row[:3] for row in rows] == [
+            ("Wilson", "Signal", "NVDA breakout"),
+            ("Wilson", "Trade", "Bought NVDA"),
+        ]
+        assert tools.flush_journal() == 0
+
+    def test_failed_batch_is_retried_then_dropped(self):
+        """A failed insert requeues the rows until JOURNAL_MAX_ATTEMPTS is hit."""
+        from app.agents import tools
+
+        with patch.object(tools, "_start_journal_flusher"), \
+             patch.object(tools, "execute_many", side_effect=Exception("db down")) as mock_many:
+            tools._log_journal("Wilson", "Error", "Order rejected")
+            for _ in range(tools.JOURNAL_MAX_ATTEMPTS - 1):
+                assert tools.flush_journal() == 0
+                assert len(tools._journal_buffer) == 1
+
+            assert tools.flush_journal() == 0
+            assert len(tools._journal_buffer) == 0
+            assert mock_many.call_count == tools.JOURNAL_MAX_ATTEMPTS
+
+    def test_failed_batch_is_written_on_retry(self):
+        """Rows requeued after a failure go out, in order, on the next flush."""
+        from app.agents import tools
+
+        with patch.object(tools, "_start_journal_flusher"), \
+             patch.object(tools, "execute_many", side_effect=[Exception("db down"), 2]) as mock_many:
+            tools._log_journal("Wilson", "Signal", "AMD breakout")
+            assert tools.flush_journal() == 0
+            tools._log_journal("Wilson", "Trade", "Bought AMD")
+            assert tools.flush_journal() == 2
+
+        rows = mock_many.call_args[0][1]
+        assert [row[2] for row in rows] == ["AMD breakout", "Bought AMD"]
+        assert tools._journal_failures == 0
+
+
+class TestGetPortfolioOverview:
+    """Tests for the concurrent portfolio overview tool."""
+
+    def test_combines_sections_and_keeps_errors(self):
+        """Each lookup lands under its own key; a failed one keeps its message."""
+        import asyncio
+        from app.agents import tools
+
+        with patch.object(tools, "_get_current_positions", return_value='[{"ticker":"NVDA"}]'), \
+             patch.object(tools, "_get_watchlist", return_value="[]"), \
+             patch.object(tools, "_check_alerts", return_value="Error checking alerts: boom"):
+            overview = orjson.loads(asyncio.run(tools._get_portfolio_overview()))
+
+        assert overview == {
+            "positions": [{"ticker": "NVDA"}],
+            "watchlist": [],
+            "alerts": "Error checking alerts: boom",
+        }
+
+
+class TestAddToWatchlist:
+    """Tests for the watchlist upsert tools."""
+
+    def test_single_add_is_one_upsert(self):
+        """add_to_watchlist writes with a single INSERT ... ON CONFLICT."""
+        from app.agents import tools
+
+        with patch.object(tools, "table_upsert", return_value=1) as mock_upsert:
+            result = tools._add_to_watchlist("nvda", "Watching", 80)
+
+        table, rows = mock_upsert.call_args[0]
+        assert table == "watchlist"
+        assert rows[0]["ticker"] == "NVDA"
+        assert mock_upsert.call_args[1]["conflict"] == "ticker"
+        assert result.startswith("✓")
+
+    def test_bulk_add_dedupes_tickers(self):
+        """Repeated tickers collapse to their last entry in one upsert."""
+        from app.agents import tools
+
+        items = [
+            {"ticker": "nvda", "status": "Watching"},
+            {"ticker": "AMD", "status": "Watching", "score": 70},
+            {"ticker": "NVDA", "status": "Long", "score": 90},
+        ]
+        with patch.object(tools, "table_upsert") as mock_upsert:
+            result = tools._add_many_to_watchlist(orjson.dumps(items).decode())
+
+        mock_upsert.assert_called_once()
+        rows = {row["ticker"]: row for row in mock_upsert.call_args[0][1]}
+        assert rows["NVDA"]["status"] == "Long"
+        assert rows["AMD"]["sentiment_score"] == 70
+        assert "2 stocks" in result
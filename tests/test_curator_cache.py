@@ -0,0 +1,54 @@
+"""Tests for Curator API response caching."""
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+class TestCachedFetch:
+    """Tests for the memory -> PostgreSQL -> HTTP lookup chain."""
+
+    def test_memory_hit_skips_db_and_fetch(self):
+        """A fresh in-process entry is returned without touching the DB."""
+        from app.agents.cache import TTLCache
+        from app.agents.curator.cache import cached_fetch
+
+        cache = TTLCache(ttl=60)
+        cache.set(("finnhub.profile", "NVDA"), {"name": "NVIDIA"})
+        fetch = MagicMock()
+
+        with patch("app.agents.curator.cache.execute_query") as mock_query:
+            result = cached_fetch("finnhub.profile", "NVDA", cache, fetch)
+
+        assert result == {"name": "NVIDIA"}
+        mock_query.assert_not_called()
+        fetch.assert_not_called()
+
+    def test_db_hit_skips_fetch(self):
+        """A fresh api_cache row is returned and promoted to memory."""
+        from app.agents.cache import TTLCache
+        from app.agents.curator.cache import cached_fetch
+
+        cache = TTLCache(ttl=60)
+        fetch = MagicMock()
+
+        with patch("app.agents.curator.cache.execute_query", return_value=[{"payload": {"name": "NVIDIA"}}]):
+            result = cached_fetch("finnhub.profile", "NVDA", cache, fetch)
+
+        assert result == {"name": "NVIDIA"}
+        assert cache.get(("finnhub.profile", "NVDA")) == {"name": "NVIDIA"}
+        fetch.assert_not_called()
+
+    def test_fetch_error_is_not_cached(self):
+        """Failed fetches propagate and leave both cache tiers untouched."""
+        from app.agents.cache import TTLCache
+        from app.agents.curator.cache import cached_fetch
+
+        cache = TTLCache(ttl=60)
+        fetch = MagicMock(side_effect=RuntimeError("HTTP 429"))
+
+        with patch("app.agents.curator.cache.execute_query", return_value=[]), \
+             patch("app.agents.curator.cache.execute_update") as mock_update:
+            with pytest.raises(RuntimeError):
+                cached_fetch("finnhub.news", "NVDA", cache, fetch)
+
+        mock_update.assert_not_called()
+        assert cache.get(("finnhub.news", "NVDA")) is None
@@ -0,0 +1,52 @@
+"""Tests for Curator's per-host rate limiting."""
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+class TestTokenBucket:
+    """Tests for the TokenBucket limiter."""
+
+    def test_burst_then_waits_for_refill(self):
+        """Tokens beyond the burst are granted at the sustained rate."""
+        from app.agents.curator.ratelimit import TokenBucket
+
+        with patch("app.agents.curator.ratelimit.time.monotonic", return_value=100.0), \
+             patch("app.agents.curator.ratelimit.time.sleep") as mock_sleep:
+            bucket = TokenBucket(2.0, 2)
+            bucket.acquire()
+            bucket.acquire()
+            mock_sleep.assert_not_called()
+
+            bucket.acquire()
+            mock_sleep.assert_called_once_with(pytest.approx(0.5))
+
+    def test_pause_delays_next_token(self):
+        """After pause(), the next caller waits out the pause."""
+        from app.agents.curator.ratelimit import TokenBucket
+
+        with patch("app.agents.curator.ratelimit.time.monotonic", return_value=100.0), \
+             patch("app.agents.curator.ratelimit.time.sleep") as mock_sleep:
+            bucket = TokenBucket(1.0, 5)
+            bucket.pause(3)
+            bucket.acquire()
+
+        mock_sleep.assert_called_once_with(pytest.approx(4.0))
+
+
+class TestThrottledGet:
+    """Tests for _throttled_get's 429 handling."""
+
+    def test_429_pauses_bucket_and_retries(self):
+        """A 429 pauses the bucket for Retry-After seconds, then retries."""
+        from app.agents.curator.tools import _throttled_get
+
+        limited = MagicMock(status_code=429, headers={"Retry-After": "7"})
+        ok = MagicMock(status_code=200)
+        bucket = MagicMock()
+
+        with patch("app.agents.curator.tools._SESSION.get", side_effect=[limited, ok]):
+            response = _throttled_get(bucket, "https://example.com", timeout=5)
+
+        assert response is ok
+        assert bucket.acquire.call_count == 2
+        bucket.pause.assert_called_once_with(7.0)
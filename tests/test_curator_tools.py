@@ -1,12 +1,30 @@
 """Tests for Curator agent tools."""
 import pytest
+import asyncio
 import json
 from unittest.mock import patch, MagicMock
 
 
+def _llm_response(content):
+    """Mocked OpenRouter chat completions HTTP response."""
+    response = MagicMock()
+    response.json.return_value = {"choices": [{"message": {"content": content}}]}
+    return response
+
+
 class TestFetchEdgarAiMentions:
     """Tests for _fetch_edgar_ai_mentions helper."""
 
+    @pytest.fixture(autouse=True)
+    def no_cache(self):
+        """Start each test with empty in-process and PostgreSQL caches."""
+        from app.agents.curator.tools import _EDGAR_CACHE
+
+        _EDGAR_CACHE.clear()
+        with patch("app.agents.curator.cache._db_cache_get", return_value=None), \
+             patch("app.agents.curator.cache._db_cache_put"):
+            yield
+
     def test_returns_dict_with_expected_keys(self):
         """Should return dict with count and snippets keys."""
         from app.agents.curator.tools import _fetch_edgar_ai_mentions
@@ -28,10 +46,10 @@ class TestFetchEdgarAiMentions:
                 "total": {"value": 1}
             }
         }
-        with patch("requests.get") as mock_get:
+        with patch("app.agents.curator.tools._SESSION.get") as mock_get:
             mock_get.return_value = MagicMock(
                 status_code=200,
-                json=lambda: mock_response
+                content=json.dumps(mock_response).encode()
             )
             result = _fetch_edgar_ai_mentions("NVDA", "NVIDIA")
 
@@ -43,10 +61,10 @@ class TestFetchEdgarAiMentions:
         """Should return count=0 when no 10-K filings found."""
         from app.agents.curator.tools import _fetch_edgar_ai_mentions
         mock_response = {"hits": {"hits": [], "total": {"value": 0}}}
-        with patch("requests.get") as mock_get:
+        with patch("app.agents.curator.tools._SESSION.get") as mock_get:
             mock_get.return_value = MagicMock(
                 status_code=200,
-                json=lambda: mock_response
+                content=json.dumps(mock_response).encode()
             )
             result = _fetch_edgar_ai_mentions("MCD", "McDonald's")
 
@@ -57,12 +75,53 @@ class TestFetchEdgarAiMentions:
         """Should return empty result on network error, not raise."""
         from app.agents.curator.tools import _fetch_edgar_ai_mentions
         import requests
-        with patch("requests.get", side_effect=requests.exceptions.Timeout):
+        with patch("app.agents.curator.tools._SESSION.get", side_effect=requests.exceptions.Timeout):
             result = _fetch_edgar_ai_mentions("NVDA", "NVIDIA")
 
         assert result["count"] == 0
         assert "error" in result
 
+    def test_repeat_lookup_served_from_cache(self):
+        """A second lookup for the same company should not hit EDGAR again."""
+        from app.agents.curator.tools import _fetch_edgar_ai_mentions
+        mock_response = {"hits": {"hits": [], "total": {"value": 4}}}
+        with patch("app.agents.curator.tools._SESSION.get") as mock_get:
+            mock_get.return_value = MagicMock(
+                status_code=200,
+                content=json.dumps(mock_response).encode()
+            )
+            first = _fetch_edgar_ai_mentions("NVDA", "NVIDIA")
+            second = _fetch_edgar_ai_mentions("NVDA", "NVIDIA")
+
+        assert mock_get.call_count == 1
+        assert first == second == {"count": 4, "snippets": []}
+
+
+class TestMatchKeywords:
+    """Tests for the _match_keywords single-pass matcher."""
+
+    def test_returns_hits_in_taxonomy_order_with_tiers(self):
+        """Tier1 hits come before tier2 hits, each in AI_KEYWORDS order."""
+        from app.agents.curator.tools import _match_keywords
+
+        hits = _match_keywords("data center gpu inference with an llm")
+
+        assert hits == [("tier1", "llm"), ("tier1", "gpu inference"), ("tier2", "data center")]
+
+    def test_ignores_tier3_keywords(self):
+        """Tier3 keywords are too noisy to score and must not match."""
+        from app.agents.curator.tools import _match_keywords
+
+        assert _match_keywords("an intelligent algorithm") == []
+
+    def test_keyword_categories_follow_category_priority(self):
+        """Keywords map to the first category whose hints they contain."""
+        from app.agents.curator.tools import _KEYWORD_CATEGORY
+
+        assert _KEYWORD_CATEGORY["gpu inference"] == "ai_chip"
+        assert _KEYWORD_CATEGORY["generative ai"] == "ai_software"
+        assert _KEYWORD_CATEGORY["data center"] is None
+
 
 class TestLlmValidation:
     """Tests for _llm_validation helper."""
@@ -80,17 +139,14 @@ class TestLlmValidation:
         }
         edgar = {"count": 3, "snippets": ["We design AI accelerators for data centers."]}
 
-        mock_completion = MagicMock()
-        mock_completion.choices = [MagicMock()]
-        mock_completion.choices[0].message.content = json.dumps({
+        content = json.dumps({
             "involvement_level": "build_ai",
             "category": "ai_chip",
             "adjusted_score": 65,
             "reasoning": "NVIDIA builds AI chips as core business."
         })
 
-        with patch("openai.OpenAI") as MockOpenAI:
-            MockOpenAI.return_value.chat.completions.create.return_value = mock_completion
+        with patch("app.agents.curator.tools._SESSION.post", return_value=_llm_response(content)):
             result = _llm_validation("NVDA", stage1, edgar)
 
         assert "involvement_level" in result
@@ -105,17 +161,14 @@ class TestLlmValidation:
         stage1 = {"company_name": "Test Corp", "sector": "Tech", "score": 45, "evidence": "", "category": "ai_beneficiary"}
         edgar = {"count": 0, "snippets": []}
 
-        mock_completion = MagicMock()
-        mock_completion.choices = [MagicMock()]
-        mock_completion.choices[0].message.content = json.dumps({
+        content = json.dumps({
             "involvement_level": "leverage_ai",
             "category": "ai_beneficiary",
             "adjusted_score": 40,
             "reasoning": "Uses AI tools."
         })
 
-        with patch("openai.OpenAI") as MockOpenAI:
-            MockOpenAI.return_value.chat.completions.create.return_value = mock_completion
+        with patch("app.agents.curator.tools._SESSION.post", return_value=_llm_response(content)):
             result = _llm_validation("TEST", stage1, edgar)
 
         valid_levels = {"research_ai", "build_ai", "leverage_ai", "use_ai"}
@@ -128,12 +181,9 @@ class TestLlmValidation:
         stage1 = {"company_name": "Test Corp", "sector": "Tech", "score": 45, "evidence": "", "category": "ai_beneficiary"}
         edgar = {"count": 0, "snippets": []}
 
-        mock_completion = MagicMock()
-        mock_completion.choices = [MagicMock()]
-        mock_completion.choices[0].message.content = "Sorry, I cannot help with that."
+        content = "Sorry, I cannot help with that."
 
-        with patch("openai.OpenAI") as MockOpenAI:
-            MockOpenAI.return_value.chat.completions.create.return_value = mock_completion
+        with patch("app.agents.curator.tools._SESSION.post", return_value=_llm_response(content)):
             result = _llm_validation("TEST", stage1, edgar)
 
         assert "involvement_level" in result
@@ -146,17 +196,14 @@ class TestLlmValidation:
         stage1 = {"company_name": "Test Corp", "sector": "Tech", "score": 95, "evidence": "", "category": "ai_chip"}
         edgar = {"count": 0, "snippets": []}
 
-        mock_completion = MagicMock()
-        mock_completion.choices = [MagicMock()]
-        mock_completion.choices[0].message.content = json.dumps({
+        content = json.dumps({
             "involvement_level": "build_ai",
             "category": "ai_chip",
             "adjusted_score": 999,
             "reasoning": "Test."
         })
 
-        with patch("openai.OpenAI") as MockOpenAI:
-            MockOpenAI.return_value.chat.completions.create.return_value = mock_completion
+        with patch("app.agents.curator.tools._SESSION.post", return_value=_llm_response(content)):
             result = _llm_validation("TEST", stage1, edgar)
 
         assert 0 <= result["adjusted_score"] <= 100
@@ -165,14 +212,19 @@ class TestLlmValidation:
 class TestScanStockForAi:
     """Integration tests for _scan_stock_for_ai orchestrator."""
 
+    @pytest.fixture(autouse=True)
+    def nothing_scanned_recently(self):
+        """Scan every ticker rather than serving stored trading_universe rows."""
+        with patch("app.agents.curator.tools._recently_scanned", return_value={}):
+            yield
+
     def test_result_always_has_involvement_level(self):
         """Every scan result must include involvement_level regardless of score."""
         from app.agents.curator.tools import _scan_stock_for_ai
 
-        with patch("app.agents.curator.tools._keyword_scoring") as mock_kw, \
-             patch("app.agents.curator.tools._fetch_edgar_ai_mentions") as mock_edgar:
+        with patch("app.agents.curator.tools._keyword_and_edgar") as mock_stages:
 
-            mock_kw.return_value = {
+            stage1 = {
                 "ticker": "MCD",
                 "company_name": "McDonald's Corporation",
                 "sector": "Consumer",
@@ -181,7 +233,7 @@ class TestScanStockForAi:
                 "category": "ai_beneficiary",
                 "evidence": ""
             }
-            mock_edgar.return_value = {"count": 0, "snippets": []}
+            mock_stages.return_value = (stage1, {"count": 0, "snippets": []})
 
             raw = _scan_stock_for_ai("MCD")
             result = json.loads(raw)
@@ -193,11 +245,10 @@ class TestScanStockForAi:
         """Score 30-70 should trigger LLM validation."""
         from app.agents.curator.tools import _scan_stock_for_ai
 
-        with patch("app.agents.curator.tools._keyword_scoring") as mock_kw, \
-             patch("app.agents.curator.tools._fetch_edgar_ai_mentions") as mock_edgar, \
+        with patch("app.agents.curator.tools._keyword_and_edgar") as mock_stages, \
              patch("app.agents.curator.tools._llm_validation") as mock_llm:
 
-            mock_kw.return_value = {
+            stage1 = {
                 "ticker": "ORCL",
                 "company_name": "Oracle Corporation",
                 "sector": "Technology",
@@ -206,7 +257,7 @@ class TestScanStockForAi:
                 "category": "ai_cloud",
                 "evidence": "Description: 'ai-powered'"
             }
-            mock_edgar.return_value = {"count": 2, "snippets": ["We offer AI cloud services."]}
+            mock_stages.return_value = (stage1, {"count": 2, "snippets": ["We offer AI cloud services."]})
             mock_llm.return_value = {
                 "involvement_level": "leverage_ai",
                 "category": "ai_cloud",
@@ -224,11 +275,10 @@ class TestScanStockForAi:
         """Score > 70 should skip LLM and set involvement_level to build_ai."""
         from app.agents.curator.tools import _scan_stock_for_ai
 
-        with patch("app.agents.curator.tools._keyword_scoring") as mock_kw, \
-             patch("app.agents.curator.tools._fetch_edgar_ai_mentions") as mock_edgar, \
+        with patch("app.agents.curator.tools._keyword_and_edgar") as mock_stages, \
              patch("app.agents.curator.tools._llm_validation") as mock_llm:
 
-            mock_kw.return_value = {
+            stage1 = {
                 "ticker": "NVDA",
                 "company_name": "NVIDIA Corporation",
                 "sector": "Technology",
@@ -237,7 +287,7 @@ class TestScanStockForAi:
                 "category": "ai_chip",
                 "evidence": "Description: 'ai chip' | Description: 'gpu inference'"
             }
-            mock_edgar.return_value = {"count": 10, "snippets": []}
+            mock_stages.return_value = (stage1, {"count": 10, "snippets": []})
 
             raw = _scan_stock_for_ai("NVDA")
             result = json.loads(raw)
@@ -247,16 +297,166 @@ class TestScanStockForAi:
         assert result["score"] == 90
 
 
+class TestRecentlyScanned:
+    """Tests for the last_scanned short-circuit."""
+
+    CACHED = {"ticker": "NVDA", "score": 90, "involvement_level": "build_ai", "cached": True}
+
+    def test_recent_scan_skips_api_calls(self):
+        """A ticker scanned in the last 24h is returned without rescanning."""
+        from app.agents.curator.tools import _scan_stock_for_ai
+
+        with patch("app.agents.curator.tools._recently_scanned", return_value={"NVDA": self.CACHED}), \
+             patch("app.agents.curator.tools._keyword_and_edgar") as mock_stages:
+            result = json.loads(_scan_stock_for_ai("nvda"))
+
+        mock_stages.assert_not_called()
+        assert result["cached"] is True
+
+    def test_force_refresh_rescans(self):
+        """force_refresh bypasses the trading_universe lookup."""
+        from app.agents.curator.tools import _scan_stock_for_ai
+
+        stage1 = {"ticker": "NVDA", "company_name": "NVIDIA", "score": 90, "evidence": ""}
+        with patch("app.agents.curator.tools._recently_scanned") as mock_lookup, \
+             patch("app.agents.curator.tools._keyword_and_edgar",
+                   return_value=(stage1, {"count": 0, "snippets": []})):
+            result = json.loads(_scan_stock_for_ai("NVDA", force_refresh=True))
+
+        mock_lookup.assert_not_called()
+        assert "cached" not in result
+
+    def test_batch_only_scans_stale_tickers(self):
+        """Batch scans skip recent tickers but keep them in input order."""
+        from app.agents.curator.tools import _scan_stock_for_ai_batch
+
+        def fake_stages(ticker):
+            return {"ticker": ticker, "score": 10, "evidence": ""}, {"count": 0, "snippets": []}
+
+        with patch("app.agents.curator.tools._recently_scanned", return_value={"NVDA": self.CACHED}), \
+             patch("app.agents.curator.tools._keyword_and_edgar", side_effect=fake_stages) as mock_stages:
+            result = json.loads(asyncio.run(_scan_stock_for_ai_batch("AMD,NVDA")))
+
+        mock_stages.assert_called_once_with("AMD")
+        assert [r["ticker"] for r in result] == ["AMD", "NVDA"]
+        assert result[1]["cached"] is True
+
+
+class TestKeywordAndEdgar:
+    """Tests for the per-ticker stage 1-2 pipeline."""
+
+    def test_edgar_uses_profile_name_without_waiting_for_news(self):
+        """EDGAR is queried with the profile's company name while news is still in flight."""
+        import threading
+        from app.agents.curator.tools import _keyword_and_edgar
+
+        news_released = threading.Event()
+
+        def slow_news(ticker, api_key):
+            assert news_released.wait(timeout=5)
+            return []
+
+        def edgar(ticker, company_name):
+            news_released.set()
+            return {"count": 1, "snippets": [], "name": company_name}
+
+        profile = {"name": "NVIDIA Corp", "finnhubIndustry": "Semis", "description": "gpu inference"}
+        with patch("app.agents.curator.tools._fetch_finnhub_profile", return_value=profile), \
+             patch("app.agents.curator.tools._fetch_finnhub_news", side_effect=slow_news), \
+             patch("app.agents.curator.tools._fetch_edgar_ai_mentions", side_effect=edgar):
+            result, edgar_data = _keyword_and_edgar("NVDA")
+
+        assert edgar_data["name"] == "NVIDIA Corp"
+        assert result["company_name"] == "NVIDIA Corp"
+        assert result["score"] == 10
+
+
+class TestScanStockForAiBatch:
+    """Tests for _scan_stock_for_ai_batch fan-out."""
+
+    @pytest.fixture(autouse=True)
+    def nothing_scanned_recently(self):
+        """Scan every ticker rather than serving stored trading_universe rows."""
+        with patch("app.agents.curator.tools._recently_scanned", return_value={}):
+            yield
+
+    def test_returns_results_in_input_order(self):
+        """Batch scan should return one result per ticker, preserving order."""
+        from app.agents.curator.tools import _scan_stock_for_ai_batch
+
+        def fake_stages(ticker):
+            stage1 = {"ticker": ticker, "company_name": ticker, "score": 10, "evidence": ""}
+            return stage1, {"count": 0, "snippets": []}
+
+        with patch("app.agents.curator.tools._keyword_and_edgar", side_effect=fake_stages):
+            raw = asyncio.run(_scan_stock_for_ai_batch("nvda, amd,,ORCL"))
+            result = json.loads(raw)
+
+        assert [r["ticker"] for r in result] == ["NVDA", "AMD", "ORCL"]
+        assert all(r["involvement_level"] == "use_ai" for r in result)
+
+    def test_borderline_tickers_share_one_llm_call(self):
+        """Borderline scores are classified together; others skip the LLM."""
+        from app.agents.curator.tools import _scan_stock_for_ai_batch
+
+        scores = {"ORCL": 50, "IBM": 40, "NVDA": 90}
+
+        def fake_stages(ticker):
+            stage1 = {"ticker": ticker, "company_name": ticker, "score": scores[ticker], "evidence": ""}
+            return stage1, {"count": 0, "snippets": []}
+
+        def fake_batch(items):
+            return [
+                {"involvement_level": "leverage_ai", "category": "ai_cloud", "adjusted_score": 55, "reasoning": "r"}
+                for _ in items
+            ]
+
+        with patch("app.agents.curator.tools._keyword_and_edgar", side_effect=fake_stages), \
+             patch("app.agents.curator.tools._llm_validation_batch", side_effect=fake_batch) as mock_batch:
+            result = json.loads(asyncio.run(_scan_stock_for_ai_batch("ORCL,IBM,NVDA")))
+
+        mock_batch.assert_called_once()
+        assert [item[0] for item in mock_batch.call_args[0][0]] == ["ORCL", "IBM"]
+        assert [r["involvement_level"] for r in result] == ["leverage_ai", "leverage_ai", "build_ai"]
+
+
+class TestLlmValidationBatch:
+    """Tests for _llm_validation_batch."""
+
+    def test_missing_ticker_falls_back_to_single_call(self):
+        """Tickers absent from the batch response are classified individually."""
+        from app.agents.curator.tools import _llm_validation_batch
+
+        items = [
+            ("ORCL", {"company_name": "Oracle", "score": 50, "category": "ai_cloud"}, {"count": 0, "snippets": []}),
+            ("IBM", {"company_name": "IBM", "score": 40, "category": "ai_software"}, {"count": 0, "snippets": []}),
+        ]
+
+        content = json.dumps({
+            "results": [
+                {"ticker": "ORCL", "involvement_level": "leverage_ai", "category": "ai_cloud",
+                 "adjusted_score": 60, "reasoning": "Cloud AI."}
+            ]
+        })
+        single = {"involvement_level": "build_ai", "category": "ai_software", "adjusted_score": 45, "reasoning": "Solo."}
+
+        with patch("app.agents.curator.tools._SESSION.post", return_value=_llm_response(content)) as mock_post, \
+             patch("app.agents.curator.tools._llm_validation", return_value=single) as mock_single:
+            results = _llm_validation_batch(items)
+
+        mock_post.assert_called_once()
+        mock_single.assert_called_once()
+        assert results[0]["adjusted_score"] == 60
+        assert results[1] == single
+
+
 class TestUpdateTradingUniverse:
     """Tests for _update_trading_universe tool."""
 
     def test_involvement_level_included_in_upsert(self):
-        """involvement_level from data_json must be written to Supabase."""
+        """involvement_level from data_json must be written to trading_universe."""
         from app.agents.curator.tools import _update_trading_universe
 
-        mock_supabase = MagicMock()
-        mock_supabase.table.return_value.upsert.return_value.execute.return_value = MagicMock()
-
         data_json = json.dumps({
             "company_name": "NVIDIA Corporation",
             "sector": "Technology",
@@ -267,10 +467,10 @@ class TestUpdateTradingUniverse:
             "notes": "Pure AI chip play"
         })
 
-        with patch("app.agents.curator.tools.supabase", mock_supabase):
+        with patch("app.agents.curator.tools.table_upsert") as mock_upsert:
             result = _update_trading_universe("NVDA", data_json)
 
-        call_args = mock_supabase.table.return_value.upsert.call_args[0][0]
+        call_args = mock_upsert.call_args[0][1][0]
         assert call_args["involvement_level"] == "build_ai"
         assert "Updated NVDA" in result
 
@@ -278,33 +478,94 @@ class TestUpdateTradingUniverse:
         """Upsert should succeed even if involvement_level not in data_json."""
         from app.agents.curator.tools import _update_trading_universe
 
-        mock_supabase = MagicMock()
-        mock_supabase.table.return_value.upsert.return_value.execute.return_value = MagicMock()
-
         data_json = json.dumps({
             "company_name": "Test Corp",
             "score": 30,
         })
 
-        with patch("app.agents.curator.tools.supabase", mock_supabase):
+        with patch("app.agents.curator.tools.table_upsert") as mock_upsert:
             result = _update_trading_universe("TEST", data_json)
 
         assert "Error" not in result
 
     def test_invalid_involvement_level_is_rejected(self):
-        """Invalid involvement_level values must not be written to Supabase."""
+        """Invalid involvement_level values must not be written to trading_universe."""
         from app.agents.curator.tools import _update_trading_universe
 
-        mock_supabase = MagicMock()
-        mock_supabase.table.return_value.upsert.return_value.execute.return_value = MagicMock()
-
         data_json = json.dumps({
             "involvement_level": "definitely_not_valid",
             "score": 50,
         })
 
-        with patch("app.agents.curator.tools.supabase", mock_supabase):
+        with patch("app.agents.curator.tools.table_upsert") as mock_upsert:
             _update_trading_universe("TEST", data_json)
 
-        call_args = mock_supabase.table.return_value.upsert.call_args[0][0]
+        call_args = mock_upsert.call_args[0][1][0]
         assert "involvement_level" not in call_args
+
+    def test_bulk_update_merges_duplicate_tickers(self):
+        """Each ticker is written once per bulk update, later fields winning."""
+        from app.agents.curator.tools import _bulk_update_trading_universe
+
+        rows = [
+            {"ticker": "nvda", "score": 80, "category": "ai_chip"},
+            {"ticker": "MSFT", "score": 70},
+            {"ticker": "NVDA", "score": 90},
+        ]
+
+        with patch("app.agents.curator.tools.table_upsert", return_value=2) as mock_upsert:
+            written = _bulk_update_trading_universe(rows)
+
+        upserted = {row["ticker"]: row for row in mock_upsert.call_args[0][1]}
+        assert written == 2
+        assert set(upserted) == {"NVDA", "MSFT"}
+        assert upserted["NVDA"]["score"] == 90
+        assert upserted["NVDA"]["category"] == "ai_chip"
+        assert mock_upsert.call_args[1]["conflict"] == "ticker"
+
+
+class TestUpdateTradingUniverseBulk:
+    """Tests for the _update_trading_universe_bulk tool."""
+
+    def test_writes_all_rows_in_one_upsert(self):
+        """All rows are passed to a single table_upsert call."""
+        from app.agents.curator.tools import _update_trading_universe_bulk
+
+        rows = [
+            {"ticker": "NVDA", "score": 90, "involvement_level": "build_ai"},
+            {"ticker": "ORCL", "score": 55, "involvement_level": "leverage_ai"},
+        ]
+        with patch("app.agents.curator.tools.table_upsert", return_value=2) as mock_upsert:
+            result = _update_trading_universe_bulk(json.dumps(rows))
+
+        mock_upsert.assert_called_once()
+        assert [row["ticker"] for row in mock_upsert.call_args[0][1]] == ["NVDA", "ORCL"]
+        assert "Updated 2 stocks" in result
+
+    def test_rejects_non_list_payload(self):
+        """A JSON object instead of a list is reported, not written."""
+        from app.agents.curator.tools import _update_trading_universe_bulk
+
+        with patch("app.agents.curator.tools.table_upsert") as mock_upsert:
+            result = _update_trading_universe_bulk(json.dumps({"ticker": "NVDA"}))
+
+        mock_upsert.assert_not_called()
+        assert result.startswith("Error")
+
+
+class TestGetTradingUniverse:
+    """Tests for _get_trading_universe query building."""
+
+    def test_full_page_returns_cursor_and_after_resumes(self):
+        """A full page includes next_cursor; passing it back adds a keyset filter."""
+        from app.agents.curator.tools import _get_trading_universe
+
+        rows = [{"ticker": "NVDA", "score": 90}, {"ticker": "AMD", "score": 80}]
+        with patch("app.agents.curator.tools.execute_query", return_value=rows) as mock_query:
+            first = json.loads(_get_trading_universe(json.dumps({"is_active": True, "limit": 2})))
+            _get_trading_universe(json.dumps({"limit": 2, "after": first["next_cursor"]}))
+
+        assert first["next_cursor"] == {"score": 80, "ticker": "AMD"}
+        query, params = mock_query.call_args[0]
+        assert "score < %s OR (score = %s AND ticker > %s)" in query
+        assert params == (80, 80, "AMD", 2)
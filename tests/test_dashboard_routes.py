@@ -0,0 +1,344 @@
+"""Tests for dashboard API routes (database helpers are patched out)."""
+import copy
+from datetime import datetime
+
+import pytest
+from unittest.mock import patch
+
+from flask import Flask
+
+from app.json_provider import ORJSONProvider
+
+
+@pytest.fixture
+def client():
+    """Test client for an app with only the dashboard blueprint registered."""
+    from app.dashboard import init_app
+
+    app = Flask(__name__)
+    app.json = ORJSONProvider(app)
+    init_app(app)
+    return app.test_client()
+
+
+class TestApiExport:
+    """Tests for the streamed CSV export."""
+
+    SCAN = {
+        "headers": ["Ticker", "Pivot"],
+        "stocks": [
+            {"Ticker": "NVDA", "Pivot": "120.5"},
+            {"Ticker": "AMD", "Pivot": "150"},
+            {"Ticker": "NVDL", "Pivot": "60, adj"},
+        ],
+    }
+
+    def test_streams_all_rows(self, client):
+        """Header and every stock are written, with CSV quoting intact."""
+        with patch("app.dashboard.routes.get_latest_scan", return_value=self.SCAN):
+            response = client.get("/api/export")
+
+        assert response.is_streamed
+        assert response.mimetype == "text/csv"
+        assert response.get_data(as_text=True).splitlines() == [
+            "Ticker,Pivot", "NVDA,120.5", "AMD,150", 'NVDL,"60, adj"',
+        ]
+
+    def test_filter_matches_ticker_substring(self, client):
+        """The filter parameter keeps only tickers containing it."""
+        with patch("app.dashboard.routes.get_latest_scan", return_value=self.SCAN):
+            response = client.get("/api/export?filter=nv")
+
+        assert response.get_data(as_text=True).splitlines() == [
+            "Ticker,Pivot", "NVDA,120.5", 'NVDL,"60, adj"',
+        ]
+
+    def test_rows_streamed_in_chunks(self, client):
+        """Rows are yielded in EXPORT_CHUNK_ROWS batches after the header."""
+        scan = {
+            "headers": ["Ticker"],
+            "stocks": [{"Ticker": f"T{i}"} for i in range(5)],
+        }
+        with patch("app.dashboard.routes.get_latest_scan", return_value=scan), \
+                patch("app.dashboard.routes.EXPORT_CHUNK_ROWS", 2):
+            response = client.get("/api/export")
+            chunks = [c.decode() for c in response.response]
+
+        assert chunks == ["Ticker\r\n", "T0\r\nT1\r\n", "T2\r\nT3\r\n", "T4\r\n"]
+
+
+class TestApiCallsClose:
+    """Tests for closing a covered call."""
+
+    TRADE = {"id": 7, "premium_total": 120.0, "strike": 500, "contracts": 1,
+             "stock_price_at_sell": 490, "notes": ""}
+
+    def test_fetches_only_the_requested_call(self, client):
+        """The call is looked up by ID rather than by listing every call."""
+        with patch("app.dashboard.routes.get_call_by_id", return_value=self.TRADE) as mock_get, \
+             patch("app.dashboard.routes.get_calls_with_summary") as mock_all, \
+             patch("app.dashboard.routes.update_call", return_value={"id": 7}) as mock_update:
+            response = client.patch("/api/calls/7", json={"status": "expired"})
+
+        assert response.status_code == 200
+        mock_get.assert_called_once_with(7)
+        mock_all.assert_not_called()
+        assert mock_update.call_args[0][1]["pnl"] == 120.0
+
+    def test_unknown_call_is_404(self, client):
+        """A missing ID returns 404 without attempting an update."""
+        with patch("app.dashboard.routes.get_call_by_id", return_value=None), \
+             patch("app.dashboard.routes.update_call") as mock_update:
+            response = client.patch("/api/calls/99", json={"status": "expired"})
+
+        assert response.status_code == 404
+        mock_update.assert_not_called()
+
+
+class TestTickerValidation:
+    """Tests for the shared ticker pattern used by the POST endpoints."""
+
+    @pytest.mark.parametrize("ticker", ["NVDA", "BRK.B", "BF-B", "A", "ABCDEFGHIJ"])
+    def test_accepts_valid_tickers(self, ticker):
+        from app.dashboard.routes import _TICKER_RE
+
+        assert _TICKER_RE.fullmatch(ticker)
+
+    @pytest.mark.parametrize("ticker", ["", "...", "-", "ABCDEFGHIJK", "NV DA", "NVDA$", "ÉTF"])
+    def test_rejects_invalid_tickers(self, ticker):
+        from app.dashboard.routes import _TICKER_RE
+
+        assert not _TICKER_RE.fullmatch(ticker)
+
+    def test_invalid_ticker_rejected_by_endpoint(self, client):
+        """POST endpoints return 400 for tickers that fail the pattern."""
+        with patch("app.dashboard.routes.add_alert") as mock_add:
+            response = client.post("/api/alerts", json={"ticker": "..", "price": 10})
+
+        assert response.status_code == 400
+        mock_add.assert_not_called()
+
+
+class TestTodayStr:
+    """Tests for the per-day cached date string."""
+
+    def test_matches_strftime(self):
+        from datetime import datetime
+        from app.dashboard.routes import _today_str
+
+        assert _today_str() == datetime.now().strftime("%Y-%m-%d")
+
+    def test_rolls_over_with_the_date(self):
+        """A new day replaces the cached string."""
+        from datetime import datetime
+        from app.dashboard import routes
+
+        with patch("app.dashboard.routes.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 3, 9, 23, 59)
+            assert routes._today_str() == "2026-03-09"
+            mock_dt.now.return_value = datetime(2026, 3, 10, 0, 1)
+            assert routes._today_str() == "2026-03-10"
+
+
+class TestCalendarView:
+    """Tests for the routine calendar."""
+
+    def test_marks_days_in_the_requested_month(self, client):
+        """Only routine dates within the month are passed, keyed by day."""
+        all_dates = {
+            "2026-03-02": {"has_premarket": True, "has_postclose": False},
+            "2026-03-31": {"has_premarket": False, "has_postclose": True},
+            "2026-04-01": {"has_premarket": True, "has_postclose": True},
+        }
+        with patch("app.dashboard.routes.get_all_routine_dates", return_value=all_dates), \
+                patch("app.dashboard.routes.render_template", return_value="") as mock_render:
+            client.get("/calendar/2026/3")
+
+        assert mock_render.call_args.kwargs["month_name"] == "March"
+        assert mock_render.call_args.kwargs["days_data"] == {
+            2: all_dates["2026-03-02"],
+            31: all_dates["2026-03-31"],
+        }
+
+
+class TestConditionalGet:
+    """Tests for ETag revalidation on polled GET endpoints."""
+
+    ALERTS = [{"id": 1, "ticker": "NVDA", "condition": "above", "price": 120}]
+
+    def test_sets_etag_and_no_cache(self, client):
+        with patch("app.dashboard.routes.get_all_alerts", return_value=self.ALERTS):
+            response = client.get("/api/alerts")
+
+        assert response.status_code == 200
+        assert response.get_json() == self.ALERTS
+        assert response.headers["ETag"]
+        assert response.cache_control.no_cache
+
+    def test_matching_etag_returns_304(self, client):
+        """A repeat poll with the same data gets an empty 304."""
+        with patch("app.dashboard.routes.get_all_alerts", return_value=self.ALERTS):
+            etag = client.get("/api/alerts").headers["ETag"]
+            response = client.get("/api/alerts", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.data == b""
+
+    def test_changed_data_returns_200(self, client):
+        """A stale ETag gets the new payload."""
+        with patch("app.dashboard.routes.get_all_alerts", return_value=self.ALERTS):
+            etag = client.get("/api/alerts").headers["ETag"]
+        with patch("app.dashboard.routes.get_all_alerts", return_value=[]):
+            response = client.get("/api/alerts", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.get_json() == []
+
+
+class TestApiData:
+    """Tests for /api/data and its per-scan response cache."""
+
+    SCAN = {
+        "id": 7,
+        "scan_stocks": [{"ticker": "NVDA", "pivot": 100, "stop": 95}],
+    }
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        from app.dashboard import routes
+
+        routes._data_cache = (None, 0.0, None)
+        yield
+        routes._data_cache = (None, 0.0, None)
+
+    STOCKS_AT = datetime(2026, 3, 9, 8, 0)
+
+    def _get(self, client, scan_key=(7, 1, STOCKS_AT), risk=1000.0):
+        with patch("app.dashboard.routes.get_latest_scan_key", return_value=scan_key), \
+                patch("app.dashboard.routes.get_risk_per_trade", return_value=risk), \
+                patch("app.dashboard.routes.get_latest_scan",
+                      side_effect=lambda: copy.deepcopy(self.SCAN)) as mock_scan:
+            response = client.get("/api/data")
+        return response, mock_scan
+
+    def test_computes_shares_and_cost(self, client):
+        response, _ = self._get(client)
+
+        stock = response.get_json()["scan_stocks"][0]
+        assert stock["Shares"] == "200"
+        assert stock["Cost"] == "$20,000"
+
+    def test_repeat_poll_served_from_cache(self, client):
+        """An unchanged scan and risk setting skip the scan fetch."""
+        first, _ = self._get(client)
+        second, mock_scan = self._get(client)
+
+        mock_scan.assert_not_called()
+        assert second.data == first.data
+        assert second.mimetype == "application/json"
+
+    def test_new_scan_or_risk_recomputes(self, client):
+        self._get(client)
+
+        _, mock_scan = self._get(client, scan_key=(8, 1, self.STOCKS_AT))
+        mock_scan.assert_called_once()
+        response, mock_scan = self._get(client, scan_key=(8, 1, self.STOCKS_AT), risk=500.0)
+        mock_scan.assert_called_once()
+        assert response.get_json()["scan_stocks"][0]["Shares"] == "100"
+
+    def test_refresh_shares_the_cache(self, client):
+        """/api/refresh builds the same response and reuses the cached body."""
+        first, _ = self._get(client)
+        with patch("app.dashboard.routes.get_latest_scan_key", return_value=(7, 1, self.STOCKS_AT)), \
+                patch("app.dashboard.routes.get_risk_per_trade", return_value=1000.0), \
+                patch("app.dashboard.routes.get_latest_scan") as mock_scan:
+            response = client.get("/api/refresh")
+
+        mock_scan.assert_not_called()
+        assert response.data == first.data
+
+    def test_replaced_stocks_recompute(self, client):
+        """Stocks deleted and re-inserted (same count, newer rows) miss the cache."""
+        self._get(client)
+        _, mock_scan = self._get(client, scan_key=(7, 1, datetime(2026, 3, 9, 9, 0)))
+
+        mock_scan.assert_called_once()
+
+    def test_cached_body_expires(self, client):
+        """An unchanged key is refetched once DATA_CACHE_TTL has passed."""
+        from app.dashboard import routes
+
+        with patch("app.dashboard.routes.time.monotonic", return_value=1000.0):
+            self._get(client)
+        with patch("app.dashboard.routes.time.monotonic",
+                   return_value=1000.0 + routes.DATA_CACHE_TTL + 1):
+            _, mock_scan = self._get(client)
+
+        mock_scan.assert_called_once()
+
+    def test_mismatched_scan_not_cached(self, client):
+        """A scan whose stocks are still being written is not cached."""
+        self._get(client, scan_key=(7, 3, self.STOCKS_AT))
+        _, mock_scan = self._get(client, scan_key=(7, 3, self.STOCKS_AT))
+
+        mock_scan.assert_called_once()
+
+
+class TestNumericValidation:
+    """Tests for the shared numeric field validation on POST endpoints."""
+
+    @pytest.mark.parametrize("body, error", [
+        ({"contracts": "x"}, "Invalid contracts (must be an integer)"),
+        ({"contracts": 0}, "Invalid contracts (must be 1-10,000)"),
+        ({"premium_per_contract": -1}, "Invalid premium (must be 0-$10,000)"),
+        ({"strike": "nan"}, "Invalid strike (must be positive, max $100k)"),
+        ({"strike": None}, "Invalid strike (must be a number)"),
+    ])
+    def test_calls_add_rejects(self, client, body, error):
+        with patch("app.dashboard.routes.add_call") as mock_add:
+            response = client.post("/api/calls", json={"strike": 500, **body})
+
+        assert response.status_code == 400
+        assert response.get_json() == {"error": error}
+        mock_add.assert_not_called()
+
+    def test_calls_add_accepts_zero_premium(self, client):
+        with patch("app.dashboard.routes.add_call", side_effect=lambda t: t) as mock_add:
+            response = client.post(
+                "/api/calls", json={"strike": 500, "premium_per_contract": 0, "contracts": "2"}
+            )
+
+        assert response.status_code == 201
+        trade = mock_add.call_args.args[0]
+        assert (trade["contracts"], trade["premium_per_contract"], trade["strike"]) == (2, 0.0, 500.0)
+
+    def test_positions_add_range_error(self, client):
+        with patch("app.dashboard.routes.add_position") as mock_add:
+            response = client.post(
+                "/api/positions", json={"ticker": "NVDA", "shares": 10, "entry_price": 200000}
+            )
+
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Invalid entry price (must be positive, max $100k)"}
+        mock_add.assert_not_called()
+
+
+class TestApiQuotes:
+    """Tests for ticker list parsing in /api/quotes."""
+
+    def test_parse_tickers_dedupes_in_order(self):
+        from app.dashboard.routes import _parse_tickers
+
+        assert _parse_tickers(" nvda,AMD,,NVDA , amd,tsla") == ("NVDA", "AMD", "TSLA")
+
+    @pytest.mark.parametrize("query", ["", "?tickers=", "?tickers=,%20,"])
+    def test_no_tickers_returns_empty(self, client, query):
+        response = client.get(f"/api/quotes{query}")
+
+        assert response.status_code == 200
+        assert response.get_json() == {}
+
+    def test_tickers_without_backend_is_501(self, client):
+        response = client.get("/api/quotes?tickers=NVDA,AMD")
+
+        assert response.status_code == 501
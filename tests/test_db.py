@@ -0,0 +1,80 @@
+"""Tests for app/db.py query helpers (the connection pool is patched out)."""
+import threading
+from contextlib import contextmanager
+from unittest.mock import MagicMock, patch
+
+from psycopg2.extras import RealDictRow
+
+
+def _patched_cursor(row, description=(("id",),)):
+    cursor = MagicMock()
+    cursor.description = description
+    cursor.fetchone.return_value = row
+
+    @contextmanager
+    def fake_get_db_cursor(cursor_factory=None):
+        yield cursor
+
+    return patch("app.db.get_db_cursor", fake_get_db_cursor)
+
+
+class TestPoolSlots:
+    """get_db_connection() waits for a free connection instead of raising."""
+
+    def test_waits_when_pool_exhausted(self):
+        from app.db import get_db_connection
+
+        acquired = threading.Event()
+
+        def borrow():
+            with get_db_connection():
+                acquired.set()
+
+        with patch("app.db._pool_slots", threading.BoundedSemaphore(1)), \
+                patch("app.db.get_connection_pool", return_value=MagicMock()) as mock_pool:
+            with get_db_connection():
+                worker = threading.Thread(target=borrow)
+                worker.start()
+                # The only slot is taken: the second caller blocks, not errors
+                assert not acquired.wait(0.1)
+                assert mock_pool.return_value.getconn.call_count == 1
+            worker.join(1)
+
+        assert acquired.is_set()
+        assert mock_pool.return_value.putconn.call_count == 2
+
+
+class TestExecuteInsert:
+    """execute_insert() returns the first RETURNING column from a dict row."""
+
+    def test_returns_returning_id(self):
+        from app.db import execute_insert
+
+        with _patched_cursor(RealDictRow(id=42)):
+            assert execute_insert("INSERT INTO scans DEFAULT VALUES RETURNING id") == 42
+
+    def test_no_returning_clause(self):
+        from app.db import execute_insert
+
+        with _patched_cursor(None, description=None):
+            assert execute_insert("INSERT INTO settings (key, value) VALUES ('a', '1')") is None
+
+
+class TestJson:
+    """json/jsonb parameters and columns go through orjson."""
+
+    def test_to_json_encodes_with_orjson(self):
+        """Dates encode as ISO strings, which stdlib json.dumps would reject."""
+        from datetime import date
+        from app.db import to_json
+
+        param = to_json({"date": date(2026, 3, 9), "score": 7.5})
+        assert param.dumps(param.adapted) == '{"date":"2026-03-09","score":7.5}'
+
+    def test_jsonb_columns_decoded(self):
+        import psycopg2.extensions
+        import app.db  # noqa: F401 - registers the typecasters
+
+        jsonb = psycopg2.extensions.string_types[3802]
+        assert jsonb.name == "JSONB"
+        assert jsonb('{"notes": "x", "n": [1, 2]}', None) == {"notes": "x", "n": [1, 2]}
@@ -0,0 +1,54 @@
+"""Tests for the orjson-backed Flask JSON provider."""
+import orjson
+import pytest
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from flask import Flask, jsonify
+
+from app.json_provider import ORJSONProvider
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = ORJSONProvider(app)
+    return app
+
+
+class TestORJSONProvider:
+    """jsonify() output must match Flask's default provider."""
+
+    def test_matches_default_provider_output(self, app):
+        """Dates, Decimals and key order serialize as Flask's stdlib provider does."""
+        from flask.json.provider import DefaultJSONProvider
+
+        payload = {
+            "b": Decimal("1.50"),
+            "a": [datetime(2025, 3, 12, 14, 30, tzinfo=timezone.utc), date(2025, 3, 12)],
+            "c": {"z": None, "y": "NVDA"},
+        }
+        with app.app_context():
+            body = jsonify(payload).get_data()
+
+        expected = DefaultJSONProvider(app).dumps(payload, separators=(",", ":"))
+        assert app.json.loads(body) == app.json.loads(expected)
+        assert body.decode().rstrip("\n") == expected
+
+    def test_response_is_json(self, app):
+        """Responses keep the application/json mimetype."""
+        with app.app_context():
+            response = jsonify(ok=True)
+
+        assert response.mimetype == "application/json"
+        assert response.get_json() == {"ok": True}
+
+    def test_request_json_parsed_by_provider(self, app):
+        """request.json bodies go through orjson via the provider's loads()."""
+        from unittest.mock import patch
+        from flask import request
+
+        with app.test_request_context(json={"ticker": "NVDA", "price": 120.5}):
+            with patch("app.json_provider.orjson.loads", wraps=orjson.loads) as mock_loads:
+                assert request.json == {"ticker": "NVDA", "price": 120.5}
+        mock_loads.assert_called_once()
@@ -1,8 +1,10 @@
 """
 Tests for utility functions in app/dashboard/utils.py
 """
+import json
 import pytest
 from datetime import date
+from unittest.mock import patch
 
 
 @pytest.mark.supabase
@@ -42,6 +44,316 @@ class TestSettingsHelpers:
         supabase_client.table('settings').delete().eq('key', 'test_key').execute()
 
 
+class TestSettingsCache:
+    """Test per-process settings caching (database calls are patched out)"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        from app.dashboard.utils import clear_settings_cache
+
+        clear_settings_cache()
+        yield
+        clear_settings_cache()
+
+    def test_settings_read_once(self):
+        """Repeated reads within the TTL hit the database once"""
+        from app.dashboard.utils import get_settings, get_risk_per_trade
+
+        rows = [{'key': 'account_equity', 'value': 50000}, {'key': 'risk_pct', 'value': 0.02}]
+        with patch('app.db.execute_query', return_value=rows) as mock_query:
+            assert get_settings()['account_equity'] == 50000
+            assert get_risk_per_trade() == 1000
+            get_settings()['account_equity'] = 1  # callers get a copy
+
+            assert get_settings()['account_equity'] == 50000
+        mock_query.assert_called_once()
+
+    def test_update_setting_invalidates(self):
+        """update_setting() forces the next read to go to the database"""
+        from app.dashboard.utils import get_settings, update_setting
+
+        with patch('app.db.execute_query', return_value=[]) as mock_query, \
+                patch('app.db.execute_update', return_value=1):
+            get_settings()
+            update_setting('risk_pct', 0.02)
+            get_settings()
+        assert mock_query.call_count == 2
+
+    def test_failed_read_not_cached(self):
+        """Fallback defaults after a database error are not cached"""
+        from app.dashboard.utils import get_settings, DEFAULT_SETTINGS
+
+        with patch('app.db.execute_query', side_effect=Exception('down')) as mock_query:
+            assert get_settings() == DEFAULT_SETTINGS
+            get_settings()
+        assert mock_query.call_count == 2
+
+
+class TestReadCache:
+    """Test cached positions/calls reads (database calls are patched out)"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        from app.dashboard import utils
+
+        utils._read_cache.clear()
+        yield
+        utils._read_cache.clear()
+
+    def test_positions_read_once(self):
+        """Repeated reads within the TTL hit the database once"""
+        from app.dashboard.utils import get_positions_with_summary
+
+        rows = [{'id': 1, 'status': 'open'}, {'id': 2, 'status': 'closed', 'pnl': 50}]
+        with patch('app.db.execute_query', return_value=rows) as mock_query:
+            positions, summary = get_positions_with_summary()
+            get_positions_with_summary()
+
+        mock_query.assert_called_once()
+        assert positions == rows
+        assert summary == {'open_count': 1, 'closed_count': 1, 'total_pnl': 50}
+
+    def test_callers_get_copies(self):
+        """Mutating a returned list or summary leaves the cached entry intact"""
+        from app.dashboard.utils import get_calls_with_summary
+
+        rows = [{'id': 1, 'status': 'open', 'premium_collected': 100}]
+        with patch('app.db.execute_query', return_value=rows):
+            trades, summary = get_calls_with_summary()
+            trades.clear()
+            summary['total_trades'] = 0
+            trades, summary = get_calls_with_summary()
+
+        assert len(trades) == 1
+        assert summary['total_trades'] == 1
+
+    def test_rows_and_nested_summaries_are_copies(self):
+        """Editing a returned row or per-ticker summary leaves the cache intact"""
+        from app.dashboard.utils import get_calls_with_summary, get_positions_with_summary
+
+        calls = [{'id': 1, 'ticker': 'NVDA', 'status': 'open', 'premium_total': 100}]
+        with patch('app.db.execute_query', return_value=calls):
+            trades, summary = get_calls_with_summary()
+            trades[0]['status'] = 'expired'
+            summary['by_ticker']['NVDA']['total_premium'] = 0
+            summary['tickers'].append('AMD')
+            trades, summary = get_calls_with_summary()
+
+        assert trades[0]['status'] == 'open'
+        assert summary['by_ticker']['NVDA']['total_premium'] == 100
+        assert summary['tickers'] == ['NVDA']
+
+        rows = [{'id': 1, 'status': 'open'}]
+        with patch('app.db.execute_query', return_value=rows):
+            positions, _ = get_positions_with_summary()
+            positions[0]['status'] = 'closed'
+            positions, summary = get_positions_with_summary()
+
+        assert positions[0]['status'] == 'open'
+        assert summary['open_count'] == 1
+
+    def test_write_invalidates(self):
+        """add/update/delete drop the cached entry"""
+        from app.dashboard.utils import get_calls_with_summary, delete_call
+
+        with patch('app.db.execute_query', return_value=[]) as mock_query, \
+                patch('app.db.execute_update', return_value=1):
+            get_calls_with_summary()
+            delete_call(1)
+            get_calls_with_summary()
+        assert mock_query.call_count == 2
+
+    def test_earnings_invalidated_by_set(self):
+        """set_earnings_date() drops the cached earnings calendar"""
+        from app.dashboard.utils import get_all_earnings, set_earnings_date
+
+        rows = [{'ticker': 'NVDA', 'earnings_date': date(2026, 5, 27)}]
+        with patch('app.db.execute_query', return_value=rows) as mock_query, \
+                patch('app.db.execute_update', return_value=1):
+            assert get_all_earnings() == {'NVDA': date(2026, 5, 27)}
+            get_all_earnings()
+            assert mock_query.call_count == 1
+
+            set_earnings_date('amd', '2026-05-05')
+            get_all_earnings()
+        assert mock_query.call_count == 2
+
+    def test_routine_dates_invalidated_by_save(self):
+        """save_routine() drops the cached calendar dates"""
+        from app.dashboard.utils import get_all_routine_dates, save_routine
+
+        rows = [{'date': date(2026, 3, 9), 'routine_type': 'premarket'}]
+        with patch('app.db.execute_query', return_value=rows) as mock_query, \
+                patch('app.db.execute_update', return_value=1):
+            dates = get_all_routine_dates()
+            get_all_routine_dates()
+            assert mock_query.call_count == 1
+
+            save_routine('2026-03-10', 'postclose', {})
+            get_all_routine_dates()
+        assert mock_query.call_count == 2
+        assert dates == {'2026-03-09': {'has_premarket': True, 'has_postclose': False}}
+
+    def test_routine_dates_returned_as_copy(self):
+        """Mutating the returned calendar leaves the cached entry intact"""
+        from app.dashboard.utils import get_all_routine_dates
+
+        rows = [{'date': date(2026, 3, 9), 'routine_type': 'premarket'}]
+        with patch('app.db.execute_query', return_value=rows):
+            dates = get_all_routine_dates()
+            dates['2026-03-09']['has_postclose'] = True
+            dates.pop('2026-03-09')
+            dates = get_all_routine_dates()
+
+        assert dates == {'2026-03-09': {'has_premarket': True, 'has_postclose': False}}
+
+    def test_failed_read_not_cached(self):
+        """A database error returns empty results and is retried next time"""
+        from app.dashboard.utils import get_calls_with_summary
+
+        with patch('app.db.execute_query', side_effect=Exception('down')) as mock_query:
+            trades, summary = get_calls_with_summary()
+            get_calls_with_summary()
+
+        assert trades == []
+        assert summary['total_trades'] == 0
+        assert mock_query.call_count == 2
+
+    def test_load_overlapping_write_not_cached(self):
+        """A read that started before an invalidation does not cache its result"""
+        from app.dashboard import utils
+
+        def stale_load():
+            utils._invalidate_read('positions')
+            return ['stale']
+
+        assert utils._cached_read('positions', stale_load) == ['stale']
+        assert utils._cached_read('positions', lambda: ['fresh']) == ['fresh']
+
+
+class TestSaveRoutine:
+    """Test routine serialization (database calls are patched out)"""
+
+    def test_serializes_dict_as_json(self):
+        from app.dashboard.utils import save_routine
+
+        data = {'notes': 'Gap up in NVDA', 'checklist': [True, False], 'score': 7.5}
+        with patch('app.db.execute_update', return_value=1) as mock_update:
+            assert save_routine('2026-03-09', 'premarket', data) is True
+
+        param = mock_update.call_args.args[1][2]
+        assert param.adapted == data
+        assert json.loads(param.dumps(param.adapted)) == data
+
+    def test_passes_strings_through(self):
+        from app.dashboard.utils import save_routine
+
+        with patch('app.db.execute_update', return_value=1) as mock_update:
+            save_routine('2026-03-09', 'premarket', '{"notes": "x"}')
+
+        assert mock_update.call_args.args[1][2] == '{"notes": "x"}'
+
+    def test_single_upsert(self):
+        """Saving is one INSERT ... ON CONFLICT statement"""
+        from app.dashboard.utils import save_routine
+
+        with patch('app.db.execute_update', return_value=1) as mock_update, \
+                patch('app.db.execute_insert') as mock_insert:
+            save_routine('2026-03-09', 'postclose', {'notes': 'x'})
+
+        mock_update.assert_called_once()
+        mock_insert.assert_not_called()
+        assert 'ON CONFLICT (date, routine_type)' in mock_update.call_args.args[0]
+
+
+class TestScanQueries:
+    """Test that scans load with their stocks in one query (database patched out)"""
+
+    ROW = {'id': 7, 'market_regime': 'uptrend', 'scan_stocks': [{'ticker': 'NVDA'}]}
+
+    def test_latest_scan_single_query(self):
+        from app.dashboard.utils import get_latest_scan
+
+        with patch('app.db.execute_query', return_value=[self.ROW]) as mock_query:
+            scan = get_latest_scan()
+
+        mock_query.assert_called_once()
+        assert 'json_agg' in mock_query.call_args.args[0]
+        assert scan == self.ROW
+
+    def test_scan_by_id_single_query(self):
+        from app.dashboard.utils import get_scan_by_id
+
+        with patch('app.db.execute_query', return_value=[self.ROW]) as mock_query:
+            scan = get_scan_by_id(7)
+
+        mock_query.assert_called_once()
+        assert mock_query.call_args.args[1] == (7,)
+        assert scan['scan_stocks'] == [{'ticker': 'NVDA'}]
+
+    def test_missing_scan_is_none(self):
+        from app.dashboard.utils import get_scan_by_id
+
+        with patch('app.db.execute_query', return_value=[]):
+            assert get_scan_by_id(99) is None
+
+
+class TestCallsSummary:
+    """Test covered call summary totals"""
+
+    TRADES = [
+        {'ticker': 'SPY', 'premium_total': 100, 'status': 'open', 'sell_date': date(2026, 1, 5)},
+        {'ticker': 'SPY', 'premium_total': 200, 'status': 'expired', 'pnl': 200,
+         'sell_date': date(2026, 2, 2)},
+        {'ticker': 'QQQ', 'premium_total': 150, 'status': 'called_away', 'pnl': -50,
+         'sell_date': '2026-02-09'},
+    ]
+
+    def test_overall_and_by_ticker(self):
+        from app.dashboard.utils import _calls_summary
+
+        summary = _calls_summary(self.TRADES)
+
+        assert summary['total_premium'] == 450
+        assert summary['total_pnl'] == 150
+        assert (summary['open'], summary['expired'], summary['called_away']) == (1, 1, 1)
+        assert summary['weekly_avg'] == 150
+        # Two distinct months of premium, annualized against $100k
+        assert summary['annualized_yield'] == pytest.approx(450 / 2 * 12 / 100000 * 100)
+        assert summary['tickers'] == ['QQQ', 'SPY']
+        assert summary['by_ticker']['SPY']['total_trades'] == 2
+        assert summary['by_ticker']['QQQ']['total_pnl'] == -50
+
+    def test_empty(self):
+        from app.dashboard.utils import _calls_summary
+
+        summary = _calls_summary([])
+
+        assert summary['total_trades'] == 0
+        assert summary['tickers'] == []
+        assert summary['by_ticker'] == {}
+
+
+class TestInsertReturning:
+    """Test that add helpers return the inserted row (database patched out)"""
+
+    def test_add_position_returns_row(self):
+        from app.dashboard.utils import add_position
+
+        row = {'id': 3, 'ticker': 'NVDA', 'shares': 10}
+        with patch('app.db.execute_query', return_value=[row]) as mock_query:
+            assert add_position({'ticker': 'NVDA', 'shares': 10}) == row
+
+        assert 'RETURNING *' in mock_query.call_args.args[0]
+
+    def test_add_call_returns_row(self):
+        from app.dashboard.utils import add_call
+
+        row = {'id': 5, 'ticker': 'SPY'}
+        with patch('app.db.execute_query', return_value=[row]):
+            assert add_call({'ticker': 'SPY'}) == row
+
+
 @pytest.mark.supabase
 @pytest.mark.integration
 class TestAlertHelpers: